@@ -16,6 +16,8 @@ import matplotlib.pyplot as plt
 import random
 import numpy as np
 from random import Random
+from SteadyStatePopulation import SteadyStatePopulation
+from GenerationStats import GenerationStats
 
 
 #EV1 Config class 
@@ -31,7 +33,10 @@ class EV1_Config:
              'minLimit': (float,True),
              'maxLimit': (float,True),
              'mutationProb': (float,True),
-             'mutationStddev': (float,True)}
+             'mutationStddev': (float,True),
+             'statsFile': (str,False),
+             'statsFormat': (str,False),
+             'dumpInterval': (int,False)}
      
     #constructor
     def __init__(self, inFileName):
@@ -72,6 +77,7 @@ def fitnessFunc(x):
 
 #Find index of worst individual in population
 def findWorstIndex(l):
+    if isinstance(l,SteadyStatePopulation): return l.worstIndex()
     minval=l[0].fit
     imin=0
     for i in range(len(l)):
@@ -96,6 +102,9 @@ def printStats(pop,gen):
 
 # Find Maximum Value and Return it
 def maximum(pop,gen):
+    if isinstance(pop,SteadyStatePopulation):
+        best=pop.best()
+        return best.fit, best.x
     max1=pop[0].fit
     state_v=pop[0].x
     for p in pop:
@@ -106,6 +115,7 @@ def maximum(pop,gen):
 
 #Find Average Value and Return it
 def avg_value(pop,gen):
+    if isinstance(pop,SteadyStatePopulation): return pop.avg()
     max1=pop[0].fit
     avg1=0
     avg=0
@@ -116,6 +126,7 @@ def avg_value(pop,gen):
 
 #Find Std_values and Return it
 def std_values(pop,gen):
+    if isinstance(pop,SteadyStatePopulation): return pop.std(ddof=1)
     std_pop = []
     for p in pop:
         std_pop.append(p.fit)
@@ -133,6 +144,9 @@ class Individual:
         self.x=x
         self.fit=fit
 
+    def __str__(self):
+        return str(self.x)+'\t'+str(self.fit)
+
 
 #EV1: The simplest EA ever!
 #            
@@ -153,9 +167,18 @@ def ev1(cfg):
         x=prng.uniform(cfg.minLimit,cfg.maxLimit)
         ind=Individual(x,fitnessFunc(x))
         population.append(ind)
+    population=SteadyStatePopulation(population)
+
+    #per-generation reporting: legacy full printout, or streamed stats records
+    if cfg.statsFile is None:
+        stats=None
+        report=printStats
+    else:
+        stats=GenerationStats(cfg.statsFile,cfg.statsFormat or 'csv',None,cfg.dumpInterval,rateName=None)
+        report=stats.record
         
     #print stats    
-    printStats(population,0)
+    report(population,0)
     maxlist = maximum(population,0)
     best_list.append(maxlist[0])
     state_values.append(maxlist[1])
@@ -167,7 +190,7 @@ def ev1(cfg):
     #evolution main loop
     for i in range(cfg.generationCount):    #Do for i=0 ~ 49
         #randomly select two parents
-        parents=prng.sample(population,2)
+        parents=prng.sample(population.population,2)
 
         #recombine using simple average (a+b/2)
         childx=(parents[0].x+parents[1].x)/2
@@ -178,22 +201,21 @@ def ev1(cfg):
             
         #survivor selection: replace worst
         child=Individual(childx,fitnessFunc(childx))
-        iworst=findWorstIndex(population)
-        if child.fit > population[iworst].fit:
-            population[iworst]=child
+        population.replaceWorst(child)
         
         #print stats    
-        printStats(population,i+1)
+        report(population,i+1)
         maxlist = maximum(population,i+1)
         best_list.append(maxlist[0])
         state_values.append(maxlist[1])
         average_list.append(avg_value(population,i+1))
         std_list.append(std_values(population,i+1))
         
+    if stats is not None: stats.close()
         
 
     #Plot Best fitness and state values  vs. generation count
-    gcount = np.arange(0,51,1)
+    gcount = np.arange(0,cfg.generationCount+1,1)
     plt.plot(gcount, best_list, linewidth=5, color="g", label = "BestFitness")
     plt.plot(gcount, state_values, linewidth=5, color="b", label = "State_values")
     plt.legend()
@@ -0,0 +1,107 @@
+#
+# SteadyStatePopulation.py
+#
+#
+
+import heapq
+import math
+
+
+#Steady-state population container for replace-worst survivor selection:
+#  - min-heap on fitness for the worst individual (O(1) lookup, O(log N) replace)
+#  - lazily cleaned max-heap for the best individual (amortized O(log N))
+#  - running mean and sum of squared deviations (Welford) for O(1) avg/std
+#
+class SteadyStatePopulation:
+    """
+    SteadyStatePopulation
+    """
+    def __init__(self, population):
+        """
+        SteadyStatePopulation constructor, population is a list of individuals with .fit
+        """
+        self.population=list(population)
+        self.version=[0]*len(self.population)
+
+        #min-heap of (fit, index): the worst individual is always at the top
+        self.worstHeap=[(ind.fit,i) for i,ind in enumerate(self.population)]
+        heapq.heapify(self.worstHeap)
+
+        #max-heap of (-fit, index, version); entries of replaced individuals go stale
+        self.rebuildBestHeap()
+
+        #running statistics
+        self.count=0
+        self.mean=0.0
+        self.m2=0.0
+        for ind in self.population: self.addStat(ind.fit)
+
+    def __len__(self):
+        return len(self.population)
+
+    def __getitem__(self,key):
+        return self.population[key]
+
+    def __iter__(self):
+        return iter(self.population)
+
+    def rebuildBestHeap(self):
+        self.bestHeap=[(-ind.fit,i,self.version[i]) for i,ind in enumerate(self.population)]
+        heapq.heapify(self.bestHeap)
+
+    def addStat(self,x):
+        self.count+=1
+        delta=x-self.mean
+        self.mean+=delta/self.count
+        self.m2+=delta*(x-self.mean)
+
+    def removeStat(self,x):
+        if self.count == 1:
+            self.count=0
+            self.mean=0.0
+            self.m2=0.0
+            return
+        oldMean=self.mean
+        self.count-=1
+        self.mean=(oldMean*(self.count+1)-x)/self.count
+        self.m2-=(x-oldMean)*(x-self.mean)
+        if self.m2 < 0.0: self.m2=0.0 #guard against round-off
+
+    def worstIndex(self):
+        return self.worstHeap[0][1]
+
+    def worst(self):
+        return self.population[self.worstHeap[0][1]]
+
+    def best(self):
+        #drop stale entries until the top refers to a live individual
+        while True:
+            negFit,i,version=self.bestHeap[0]
+            if version == self.version[i]: return self.population[i]
+            heapq.heappop(self.bestHeap)
+
+    def replaceWorst(self,child):
+        """
+        Survivor selection: replace the worst individual if child is fitter, returns True if replaced
+        """
+        worstFit,i=self.worstHeap[0]
+        if not child.fit > worstFit: return False
+
+        self.removeStat(worstFit)
+        self.addStat(child.fit)
+
+        self.population[i]=child
+        self.version[i]+=1
+        heapq.heapreplace(self.worstHeap,(child.fit,i))
+        heapq.heappush(self.bestHeap,(-child.fit,i,self.version[i]))
+
+        #keep the lazy heap from growing without bound
+        if len(self.bestHeap) > 2*len(self.population): self.rebuildBestHeap()
+        return True
+
+    def avg(self):
+        return self.mean
+
+    def std(self,ddof=1):
+        if self.count-ddof <= 0: return float('nan')
+        return math.sqrt(self.m2/(self.count-ddof))
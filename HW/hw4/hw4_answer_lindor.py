@@ -18,6 +18,8 @@ import sys
 import yaml
 import math
 from random import Random
+from SteadyStatePopulation import SteadyStatePopulation
+from GenerationStats import GenerationStats
 
 
 #EV2 Config class 
@@ -31,7 +33,10 @@ class EV2_Config:
              'generationCount': (int,True),
              'randomSeed': (int,True),
              'minLimit': (float,True),
-             'maxLimit': (float,True)}
+             'maxLimit': (float,True),
+             'statsFile': (str,False),
+             'statsFormat': (str,False),
+             'dumpInterval': (int,False)}
     
     #number of children per generation (should probably be an input cfg param, but...)
     numChildren=5
@@ -75,6 +80,7 @@ def fitnessFunc(x):
 
 #Find index of worst individual in population
 def findWorstIndex(l):
+    if isinstance(l,SteadyStatePopulation): return l.worstIndex()
     minval=l[0].fit
     imin=0
     for i in range(len(l)):
@@ -147,6 +153,9 @@ class Individual:
     def evaluateFitness(self):
         self.fit=self.__class__.fitFunc(self.x)
 
+    def __str__(self):
+        return str(self.x)+'\t'+str(self.fit)+'\t'+str(self.sigma)
+
 
 #EV2: EV1 with self-adaptive mutation & stochastic crossover, multiple children per gen
 #            
@@ -166,16 +175,25 @@ def ev2(cfg):
     for i in range(cfg.populationSize):
         ind=Individual()
         population.append(ind)
+    population=SteadyStatePopulation(population)
+
+    #per-generation reporting: legacy full printout, or streamed stats records
+    if cfg.statsFile is None:
+        stats=None
+        report=printStats
+    else:
+        stats=GenerationStats(cfg.statsFile,cfg.statsFormat or 'csv',None,cfg.dumpInterval,rateName='sigma')
+        report=stats.record
         
     #print stats    
-    printStats(population,0)
+    report(population,0)
 
     #evolution main loop
     for i in range(cfg.generationCount):
         children=[]
         for j in range(cfg.numChildren):
             #randomly select two parents
-            parents=prng.sample(population,2)
+            parents=prng.sample(population.population,2)
     
             #recombine
             child=parents[0].crossover(parents[1])
@@ -190,12 +208,12 @@ def ev2(cfg):
         
         for child in children:        
             #survivor selection: replace worst
-            iworst=findWorstIndex(population)
-            if child.fit > population[iworst].fit:
-                population[iworst]=child
+            population.replaceWorst(child)
         
         #print stats    
-        printStats(population,i+1)
+        report(population,i+1)
+
+    if stats is not None: stats.close()
         
         
 #
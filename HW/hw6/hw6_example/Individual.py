@@ -41,6 +41,14 @@ class Individual:
         self.x=self.x+(self.maxLimit-self.minLimit)*self.sigma*self.normprng.normalvariate(0,1)
         self.fit=None
     
+    def clone(self):
+        #cheap copy of the per-individual data only (no deepcopy, no ctor/evaluation)
+        other=self.__class__.__new__(self.__class__)
+        other.x=self.x
+        other.fit=self.fit
+        other.sigma=self.sigma
+        return other
+
     def evaluateFitness(self):
         if self.fit == None: self.fit=self.__class__.fitFunc(self.x)
         
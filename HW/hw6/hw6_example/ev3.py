@@ -15,6 +15,7 @@ import optparse
 import sys
 import yaml
 import math
+import numpy as np
 from random import Random
 from Population import *
 from Individual import Individual
@@ -109,6 +110,7 @@ def ev3(cfg):
     Individual.normprng=normprng
     Population.uniprng=uniprng
     Population.crossoverFraction=cfg.crossoverFraction
+    Population.rng=np.random.default_rng(cfg.randomSeed)
     
       
     
@@ -22,23 +22,14 @@ class Individual:
     numParticleTypes=None
     latticeLength=None
     interactionEnergyMatrix=None
+    pairEnergyTable=None    #pairEnergyTable[a][b]: energy of neighbours a,b (both directions)
     selfEnergyVector=None
+    particleNames=None      #display name of every particle type
 
 
     def __init__(self):
-        #setting dictionary of particle
-        self.particle_types={}
-        for j in range(self.numParticleTypes):
-            if j==0:
-                self.particle_types.update({'r':0})
-            elif j==1:
-                self.particle_types.update({'b':1})
-            elif j==2:
-                self.particle_types.update({'g':2})
-
         self.x=[self.uniprng.randrange(0,self.numParticleTypes) for _ in range(self.latticeLength)]
-        self.fit=self.__class__.fitFunc(self.x, self.particle_types ,self.interactionEnergyMatrix, self.selfEnergyVector)
-        self.key=self.__class__.get_key_func(self.particle_types,self.x)
+        self.fit=self.__class__.fitFunc(self.x, self.pairEnergyTable, self.selfEnergyVector)
         self.sigma=self.uniprng.uniform(0.9,0.1) #use "normalized" sigma
 
 
@@ -83,10 +74,19 @@ class Individual:
     
     def evaluateFitness(self):
 
-        if self.fit == None: self.fit=self.__class__.fitFunc(self.x, self.particle_types, self.interactionEnergyMatrix, self.selfEnergyVector)
+        if self.fit == None: self.fit=self.__class__.fitFunc(self.x, self.pairEnergyTable, self.selfEnergyVector)
+
+    def clone(self):
+        #cheap copy of the per-individual data only (no deepcopy, no ctor/evaluation)
+        other=self.__class__.__new__(self.__class__)
+        other.x=list(self.x)
+        other.fit=self.fit
+        other.sigma=self.sigma
+        return other
 
     def get_key(self):
-        self.key=self.__class__.get_key_func(self.particle_types,self.x)
+        #human-readable particle series, only built for printing
+        return self.__class__.get_key_func(self.particleNames,self.x)
 
         
     def __str__(self):
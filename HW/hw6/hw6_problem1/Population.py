@@ -5,15 +5,44 @@
 
 import copy
 import math
+import numpy as np
 from operator import attrgetter
 from Individual import *
 
 
+#k-way tournament selection on a fitness-like key (larger wins): every
+# individual enters k tournaments (one random permutation per entrant slot,
+# nobody meets itself), ties go to a random entrant.  Returns the winner
+# indices so the caller can gather the winners in one take.
+#
+def tournamentSelect(key,rng,k=2):
+    n=len(key)
+    if k < 2 or k > n: raise Exception('Invalid tournament size: ' + str(k))
+    entrants=np.empty((n,k),dtype=np.intp)
+    for j in range(k):
+        col=entrants[:,j]
+        col[:]=rng.permutation(n)
+        # do not allow self competition: swap clashing entries with random rows
+        while j > 0:
+            clash=np.flatnonzero((entrants[:,:j] == col[:,None]).any(axis=1))
+            if len(clash) == 0: break
+            for i in clash.tolist():
+                r=int(rng.integers(n))
+                col[i],col[r]=col[r],col[i]
+
+    #compete
+    keys=key[entrants]
+    tie=np.where(keys == keys.max(axis=1)[:,None],rng.random((n,k)),-1.0)
+    return entrants[np.arange(n),tie.argmax(axis=1)]
+
+
 class Population:
     """
     Population
     """
     uniprng=None
+    rng=None    #NumPy Generator for tournament selection
+    tournamentSize=2
     crossoverFraction=None
     generation=None
     
@@ -44,10 +73,6 @@ class Population:
         for individual in self.population: 
             individual.evaluateFitness()
     
-    def get_key(self):
-        for individual in self.population:
-            individual.get_key()
-            
     def mutate(self):     
         for individual in self.population:
             individual.mutate()
@@ -70,40 +95,15 @@ class Population:
         
             
     def conductTournament(self):
-        # binary tournament
-        indexList1=list(range(len(self)))
-        indexList2=list(range(len(self)))
-        
-        self.uniprng.shuffle(indexList1)
-        self.uniprng.shuffle(indexList2)
-        
-        # do not allow self competition
-        for i in range(len(self)):
-            if indexList1[i] == indexList2[i]:
-                temp=indexList2[i]
-                if i == 0:
-                    indexList2[i]=indexList2[-1]
-                    indexList2[-1]=temp
-                else:
-                    indexList2[i]=indexList2[i-1]
-                    indexList2[i-1]=temp
-        
-        #compete
-        newPop=[]        
-        for index1,index2 in zip(indexList1,indexList2):                        #For fitness value small wins
-            if self[index1].fit < self[index2].fit:
-                newPop.append(copy.deepcopy(self[index1]))
-            elif self[index1].fit > self[index2].fit:
-                newPop.append(copy.deepcopy(self[index2]))
-            else:
-                rn=self.uniprng.random()
-                if rn > 0.5:
-                    newPop.append(copy.deepcopy(self[index1]))
-                else:
-                    newPop.append(copy.deepcopy(self[index2]))
-        
-        # overwrite old pop with newPop    
-        self.population=newPop        
+        # k-way tournament (binary by default), smaller fitness (energy) wins
+        key=-np.fromiter((individual.fit for individual in self.population),dtype=float,count=len(self))
+        winners=tournamentSelect(key,self.rng,self.tournamentSize)
+
+        # overwrite old pop with the winners: first occurrences are reused (the
+        # offspring population is a private copy), repeated winners are cloned
+        first=np.zeros(len(winners),dtype=bool)
+        first[np.unique(winners,return_index=True)[1]]=True
+        self.population=[self.population[i] if f else self.population[i].clone() for i,f in zip(winners.tolist(),first.tolist())]
 
 
     def combinePops(self,otherPop):
@@ -119,7 +119,7 @@ class Population:
         min_value=self.population[0].fit
         self.best_fit=[]
         for individual in self.population:
-            print("particles_series: ", individual.key, "   total_energy is:", individual.fit )
+            print("particles_series: ", individual.get_key(), "   total_energy is:", individual.fit )
         
         for individual in self.population:
             if individual.fit < min_value:
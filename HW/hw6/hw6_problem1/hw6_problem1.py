@@ -15,6 +15,7 @@ import optparse
 import sys
 import yaml
 import math
+import numpy as np
 from random import Random
 from Population import *
 from Individual import Individual
@@ -70,64 +71,25 @@ class EV3_Config:
         return str(yaml.dump(self.__dict__,default_flow_style=False))
          
 
-#Simple fitness function example: 1-D Rastrigin function
+#Lattice energy: self-energies plus the interaction energy of every
+# neighbour pair, read from a precomputed integer-indexed table
 #        
-def fitnessFunc(particle_series, particle_types ,interactionEnergyMatrix, selfEnergyVector):
-
+def fitnessFunc(particle_series, pairEnergyTable, selfEnergyVector):
     loss_value=0
-    #self-energy
     for i in particle_series:
-        loss_value = loss_value + selfEnergyVector[i]
-    
-    #interaction-energy with previous one
-    for i in range(len(particle_series)):
-        if i==0:
-            loss_value=loss_value
-        else:
-            compare=get_key(particle_types, particle_series[i:i+1]) + get_key(particle_types, particle_series[i-1:i])
-            if compare == ['r','r']:
-                loss_value = loss_value + interactionEnergyMatrix[0][0]
-            elif compare == ['r','b']:
-                loss_value = loss_value + interactionEnergyMatrix[0][1]
-            elif compare == ['r','g']:
-                loss_value = loss_value + interactionEnergyMatrix[0][2]
-            elif compare == ['b','r']:
-                loss_value = loss_value + interactionEnergyMatrix[1][0]
-            elif compare == ['b','b']:
-                loss_value = loss_value + interactionEnergyMatrix[1][1]
-            elif compare == ['b','g']:
-                loss_value = loss_value + interactionEnergyMatrix[1][2]
-            elif compare == ['g','r']:
-                loss_value = loss_value + interactionEnergyMatrix[2][0]
-            elif compare == ['g','b']:
-                loss_value = loss_value + interactionEnergyMatrix[2][1]
-            elif compare == ['g','g']:
-                loss_value = loss_value + interactionEnergyMatrix[2][2]
+        loss_value+=selfEnergyVector[i]
+    for a,b in zip(particle_series,particle_series[1:]):
+        loss_value+=pairEnergyTable[a][b]
+    return loss_value
 
-    #interaction-energy with latter one
-    for i in range(len(particle_series)-1):
-        compare=get_key(particle_types, particle_series[i:i+2])
-        if compare == ['r','r']:
-            loss_value = loss_value + interactionEnergyMatrix[0][0]
-        elif compare == ['r','b']:
-            loss_value = loss_value + interactionEnergyMatrix[0][1]
-        elif compare == ['r','g']:
-            loss_value = loss_value + interactionEnergyMatrix[0][2]
-        elif compare == ['b','r']:
-            loss_value = loss_value + interactionEnergyMatrix[1][0]
-        elif compare == ['b','b']:
-            loss_value = loss_value + interactionEnergyMatrix[1][1]
-        elif compare == ['b','g']:
-            loss_value = loss_value + interactionEnergyMatrix[1][2]
-        elif compare == ['g','r']:
-            loss_value = loss_value + interactionEnergyMatrix[2][0]
-        elif compare == ['g','b']:
-            loss_value = loss_value + interactionEnergyMatrix[2][1]
-        elif compare == ['g','g']:
-            loss_value = loss_value + interactionEnergyMatrix[2][2]
-    
 
-    return loss_value
+#Each neighbour pair (a,b) contributes interactionEnergyMatrix[a][b] (seen
+# from the left particle) and interactionEnergyMatrix[b][a] (seen from the
+# right one), so the table stores their sum
+#
+def pairEnergyTable(interactionEnergyMatrix):
+    n=len(interactionEnergyMatrix)
+    return [[interactionEnergyMatrix[a][b]+interactionEnergyMatrix[b][a] for b in range(n)] for a in range(n)]
 
 
 #Print some useful stats to screen
@@ -135,14 +97,12 @@ def printStats(pop,gen):
     print('Generation:',gen)
     pop.print_show()
 
-def get_key(dict,list1):                #Send the particles of [0,1,0,2,0...] and changes to ['r','b','r','g','r',...] 
-    keys=[]
-    for i in list1:
-        for key,values in dict.items():
-            if values==i:
-                keys.append(key)
-        
-    return keys
+def get_key(particleNames,list1):                #Send the particles of [0,1,0,2,0...] and changes to ['r','b','r','g','r',...] 
+    return [particleNames[i] for i in list1]
+
+def particleNames(numParticleTypes):
+    #display names: r/b/g for the first three types, the type index beyond
+    return [('r','b','g')[j] if j < 3 else str(j) for j in range(numParticleTypes)]
 
 
 
@@ -156,6 +116,10 @@ def ev3(cfg):
     normprng=Random()
     normprng.seed(cfg.randomSeed+101)
 
+    if len(cfg.selfEnergyVector) != cfg.numParticleTypes or len(cfg.interactionEnergyMatrix) != cfg.numParticleTypes \
+       or any(len(row) != cfg.numParticleTypes for row in cfg.interactionEnergyMatrix):
+        raise Exception('selfEnergyVector/interactionEnergyMatrix must match numParticleTypes')
+
     #set static params on classes
     # (probably not the most elegant approach, but let's keep things simple...)
     Individual.minLimit=cfg.minLimit
@@ -168,11 +132,14 @@ def ev3(cfg):
     Individual.numParticleTypes=cfg.numParticleTypes
     Individual.latticeLength=cfg.latticeLength
     Individual.interactionEnergyMatrix=cfg.interactionEnergyMatrix
+    Individual.pairEnergyTable=pairEnergyTable(cfg.interactionEnergyMatrix)
     Individual.selfEnergyVector=cfg.selfEnergyVector
+    Individual.particleNames=particleNames(cfg.numParticleTypes)
 
 
     Population.uniprng=uniprng
     Population.crossoverFraction=cfg.crossoverFraction
+    Population.rng=np.random.default_rng(cfg.randomSeed)
       
     
     #create initial Population (random initialization)
@@ -201,7 +168,6 @@ def ev3(cfg):
         
         #update fitness values
         offspring.evaluateFitness()   
-        offspring.get_key()     
             
         #survivor selection: elitist truncation using parents+offspring
         population.combinePops(offspring)
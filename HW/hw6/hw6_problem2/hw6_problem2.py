@@ -15,6 +15,7 @@ import optparse
 import sys
 import yaml
 import math
+import numpy as np
 from random import Random
 from Population2 import *
 from Individual2 import Individual
@@ -107,6 +108,7 @@ def ev3(cfg):
 
     Population.uniprng=uniprng
     Population.crossoverFraction=cfg.crossoverFraction
+    Population.rng=np.random.default_rng(cfg.randomSeed)
     Population.mode=cfg.mode
       
     
@@ -24,8 +24,16 @@
 
 from random import Random
 import math
+import bisect
 import matplotlib.pyplot as plt
 import copy
+import numpy as np
+
+#optional: KD-tree for k-nearest-neighbor crowding (falls back to blocked partial selection)
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree=None
 
 #
 # Individual class
@@ -56,21 +64,22 @@ class Individual:
         other_dominates_self =-1
         non_domination = 0
         
-        domination_flag_cur=0
-        domination_flag_pre=0
+        #track whether self is strictly better / strictly worse in any objective
+        self_better=False
+        other_better=False
         
         for idx, item in enumerate(self.objectives):
-            domination_flag_pre = domination_flag_cur
             if item < other.objectives[idx]:
-                domination_flag_cur = self_dominates_other
+                self_better=True
             elif item > other.objectives[idx]:
-                domination_flag_cur = other_dominates_self
-            else:
-                domination_flag_cur = non_domination
+                other_better=True
 
-            if domination_flag_pre != non_domination and domination_flag_cur != domination_flag_pre:
+            if self_better and other_better:
                 return non_domination
-        return domination_flag_cur
+
+        if self_better: return self_dominates_other
+        if other_better: return other_dominates_self
+        return non_domination
         
     
     def compareRankAndCrowding(self, other):
@@ -101,6 +110,12 @@ class Individual:
                 return 0
         
     
+    def clone(self):
+        """
+        Cheap copy (new state/objective lists, no deepcopy)
+        """
+        return self.__class__(list(self.state),list(self.objectives),self.frontRank,self.crowdDist)
+    
     def distance(self, other, normalizationVec=[None]):
         """
         Compute distance between self & other in objective space
@@ -137,10 +152,261 @@ class Individual:
         return s
 
     
+#
+# Pareto domination matrix for objective arrays (minimization):
+#  result[i,j] is True if objA[i] dominates objB[j]
+#
+def dominationMatrix(objA,objB):
+    #loop over the (few) objectives, each step is one 2-D comparison
+    noWorse=np.ones((len(objA),len(objB)),dtype=bool)
+    better=np.zeros((len(objA),len(objB)),dtype=bool)
+    for m in range(objA.shape[1]):
+        a=objA[:,m,None]
+        b=objB[None,:,m]
+        noWorse&=a <= b
+        better|=a < b
+    return noWorse & better
+
+
+#
+# Front ranks (1: non-dominated) of an (N,M) objective array by fast
+#  non-dominated sort; the domination matrix is built in row blocks of at
+#  most blockElements elements so memory stays bounded for large populations
+#
+def vectorizedFrontRanks(obj,blockElements):
+    n=len(obj)
+    blockSize=max(1,blockElements//(n*obj.shape[1]))
+    
+    #how many individuals dominate each individual
+    dominationCounts=np.zeros(n,dtype=np.int64)
+    for start in range(0,n,blockSize):
+        dominationCounts+=dominationMatrix(obj[start:start+blockSize],obj).sum(axis=0)
+    
+    #peel off fronts, discounting domination by each removed front
+    ranks=np.zeros(n,dtype=np.int64)
+    remaining=np.ones(n,dtype=bool)
+    front=np.flatnonzero(dominationCounts == 0)
+    frontRankCnt=1
+    while len(front):
+        ranks[front]=frontRankCnt
+        remaining[front]=False
+        rest=np.flatnonzero(remaining)
+        for start in range(0,len(front),blockSize):
+            dominationCounts[rest]-=dominationMatrix(obj[front[start:start+blockSize]],obj[rest]).sum(axis=0)
+        front=rest[dominationCounts[rest] == 0]
+        frontRankCnt+=1
+    return ranks
+
+
+#
+# Front ranks of an (N,2) objective array in O(N log N): sweep the rows in
+#  lexicographic (f1,f2) order, each joins the first front whose last member
+#  does not dominate it, found by bisection over the fronts' staircase
+#
+def biObjectiveFrontRanks(obj):
+    #the last member (f1,f2) of front k dominates a later individual (f1',f2') of
+    # the sweep iff (f2,f1) < (f2',f1'), and these keys never decrease with k
+    lastKeys=[]
+    ranks=np.empty(len(obj),dtype=np.int64)
+    order=np.lexsort((obj[:,1],obj[:,0]))
+    for i,f1,f2 in zip(order.tolist(),obj[order,0].tolist(),obj[order,1].tolist()):
+        key=(f2,f1)
+        k=bisect.bisect_left(lastKeys,key)
+        if k == len(lastKeys): lastKeys.append(key)
+        else: lastKeys[k]=key
+        ranks[i]=k+1
+    return ranks
+
+
+#
+# k-th nearest-neighbor crowding distances (k=sqrt(N), range-normalized
+#  objectives) of an (N,M) objective array, with a KD-tree if scipy is
+#  available, else with blocked partial selection
+#
+def knnCrowdingDistances(obj,blockElements):
+    n=len(obj)
+    
+    # if single objective, all densities are zero
+    if obj.shape[1] == 1: return np.zeros(n)
+    
+    # compute k for knn density estimate (index 0 is the individual itself)
+    kdist=min(int(math.sqrt(n)),n-1)
+    
+    # normalize objectives by their range
+    normVec=np.ptp(obj,axis=0)
+    normVec[normVec == 0]=1.0 #watch out for possible divide by zero problems
+    obj=obj/normVec
+    
+    if cKDTree is not None:
+        return cKDTree(obj).query(obj,k=[kdist+1])[0][:,0]
+    
+    # k-th smallest squared distance per row, one block of rows at a time
+    crowdDist=np.empty(n)
+    blockSize=max(1,blockElements//n)
+    for start in range(0,n,blockSize):
+        block=obj[start:start+blockSize]
+        dist2=np.zeros((len(block),n))
+        for m in range(obj.shape[1]):
+            diff=block[:,m,None]-obj[None,:,m]
+            dist2+=diff*diff
+        crowdDist[start:start+blockSize]=np.partition(dist2,kdist,axis=1)[:,kdist]
+    return np.sqrt(crowdDist)
+
+
+#
+# NSGA-II cuboid crowding distances of an (N,M) objective array, O(M*N log N):
+#  sum over the objectives of the range-normalized gap between each
+#  individual's neighbors in that objective, boundary individuals get inf
+#
+def cuboidCrowdingDistances(obj):
+    n=len(obj)
+    crowdDist=np.zeros(n)
+    for m in range(obj.shape[1]):
+        order=np.argsort(obj[:,m],kind='stable')
+        values=obj[order,m]
+        norm=values[-1]-values[0]
+        if norm == 0: norm=1.0 #watch out for possible divide by zero problems
+        crowdDist[order[1:-1]]+=(values[2:]-values[:-2])/norm
+        crowdDist[order[[0,-1]]]=np.inf
+    return crowdDist
+
+
+#
+# Random tournament pairs for a population of size n: every individual
+#  takes part in exactly 2 tournaments, never against itself
+#
+def tournamentPairs(n,prng):
+    indexList1 = list(range(n))
+    indexList2 = list(range(n))
+    prng.shuffle(indexList1)
+    prng.shuffle(indexList2)
+
+    # do not allow pop competition
+    for i in range(n):
+        if indexList1[i] == indexList2[i]:
+            temp = indexList2[i]
+            if i == 0:
+                indexList2[i] = indexList2[-1]
+                indexList2[-1] = temp
+            else:
+                indexList2[i] = indexList2[i-1]
+                indexList2[i-1] = temp
+    return indexList1,indexList2
+
+
+#
+# k-way tournaments with the comparison of Individual.compareRankAndCrowding
+#  on array fields: lower front rank wins, then larger crowding distance,
+#  remaining ties go to a random entrant.  Every individual enters k
+#  tournaments (one random permutation per entrant slot, nobody meets
+#  itself).  Returns the winner indices (rng: NumPy Generator).
+#
+def crowdedTournament(frontRank,crowdDist,rng,k=2):
+    n=len(frontRank)
+    if k < 2 or k > n: raise Exception('Invalid tournament size: ' + str(k))
+    entrants=np.empty((n,k),dtype=np.intp)
+    for j in range(k):
+        col=entrants[:,j]
+        col[:]=rng.permutation(n)
+        # do not allow self competition: swap clashing entries with random rows
+        while j > 0:
+            clash=np.flatnonzero((entrants[:,:j] == col[:,None]).any(axis=1))
+            if len(clash) == 0: break
+            for i in clash.tolist():
+                r=int(rng.integers(n))
+                col[i],col[r]=col[r],col[i]
+
+    #compete: best front rank first, then the least crowded
+    ranks=frontRank[entrants]
+    best=ranks == ranks.min(axis=1)[:,None]
+    dists=np.where(best,crowdDist[entrants],-np.inf)
+    best&=dists == dists.max(axis=1)[:,None]
+    tie=np.where(best,rng.random((n,k)),-1.0)
+    return entrants[np.arange(n),tie.argmax(axis=1)]
+
+
+#
+# Plots of a population given as arrays (state, objectives, frontRank or None):
+#   1. Individuals in state space
+#   2. Individuals in objective space
+#   3. Non-dominated ranked fronts in objective space
+#
+def plotPopulation(state,objectives,frontRank,title=None,showScreen=True,saveToFile=False,fileName=None):
+    #first, make sure state & objective space have at least 2 dimensions, pop size at least 1
+    if len(state) < 1:
+        raise Exception('showPlots error: Population size must be >= 1 !')
+    if (state.shape[1] < 2) or (objectives.shape[1] < 2):
+        raise Exception('showPlots error: State & objective spaces must have at least 2 dimensions!')
+
+    #if front ranking has not been computed, then skip
+    # the front-rank plot
+    if frontRank is None: plotOrder=[121,122,000]
+    else: plotOrder=[131,132,133]
+    
+    #top-level attributes for collection of subplots
+    if title is not None:
+        fig, axs = plt.subplots(13)
+        fig.suptitle(title)
+    plt.subplots_adjust(wspace=0.75) #increase spacing between plots a bit
+    
+    #individuals in state space
+    plt.subplot(plotOrder[0])
+    plt.scatter(state[:,0],state[:,1])
+    plt.xlabel('x1')
+    plt.ylabel('x2')
+    plt.title('State Space')
+    
+    
+    #individuals in objective space
+    plt.subplot(plotOrder[1])
+    plt.scatter(objectives[:,0],objectives[:,1])
+    plt.xlabel('f1')
+    plt.ylabel('f2')
+    plt.title('Objective Space')
+    
+    
+    #Note: If front ranks have not been computed, then
+    #      skip the frontRank plot...
+    if frontRank is not None:
+        #non-dominated ranked fronts in objective space
+        plt.subplot(plotOrder[2])   
+        
+        rank=0
+        while rank <= frontRank.max():
+            xy=objectives[frontRank == rank]
+            xy=xy[np.argsort(xy[:,0],kind='stable')] #need to sort in 1st dim to make connected line plots look sensible!
+            plt.plot(xy[:,0],xy[:,1],marker='o',label=str(rank))
+            rank+=1
+            
+        plt.xlabel('f1')
+        plt.ylabel('f2')
+        plt.title('Ranked Fronts')
+
+    #write plots to file?
+    if saveToFile:
+        plt.savefig(fileName)
+    
+    #display on screen?
+    if showScreen:
+        plt.show()
+
+
 #
 # Population class
 #
 class Population:
+    #front-ranking engine used by updateRanking: 'original', 'fast', 'numpy',
+    # 'biobjective', or 'auto' (biobjective for 2 objectives, numpy otherwise)
+    rankingMethod='auto'
+    #crowding engine used by updateRanking: 'original' or 'knn'
+    crowdingMethod='knn'
+    #cap on domination-matrix elements per block, bounds memory of the numpy engine
+    blockElements=1<<22
+    #binaryTournament mode: 'frontRank' (binary, front rank only) or
+    # 'rankAndCrowding' (k-way crowdedTournament with tournamentSize entrants)
+    tournamentMethod='frontRank'
+    tournamentSize=2
+    
     def __init__(self, pop=None):
         """
         Population Ctor
@@ -202,6 +468,17 @@ class Population:
             ind.crowdDist=distanceMatrix[i][kdist]
             i+=1            
 
+    def knnCrowding(self):
+        """
+        Same k-th nearest-neighbor crowding metric as computeCrowding, computed on a
+        normalized objective array with a KD-tree (if scipy is available) or with
+        blocked partial selection, never building the full sorted distance matrix
+        """
+        if len(self.pop) == 0: return #nothing to do
+        crowdDist=knnCrowdingDistances(self.objectiveArray(),self.blockElements)
+        for ind,dist in zip(self.pop,crowdDist.tolist()):
+            ind.crowdDist=dist
+
     def computeFrontRanks(self):
         """
         Compute non-dominated front ranks using NSGA-II front-ranking scheme
@@ -247,14 +524,96 @@ class Population:
             frontRankCnt +=1
         self.pop = newPop
 
+    def fastNonDominatedSort(self):
+        """
+        Compute non-dominated front ranks using Deb's fast non-dominated sort
+        (domination counts + dominated sets), O(M*N^2)
+        """
+        pop=self.pop
+        n=len(pop)
+        dominatedSets=[[] for i in range(n)]
+        dominationCounts=[0]*n
+        
+        for i in range(n):
+            for j in range(i+1,n):
+                flag=pop[i].dominates(pop[j])
+                if flag == 1:
+                    dominatedSets[i].append(j)
+                    dominationCounts[j]+=1
+                elif flag == -1:
+                    dominatedSets[j].append(i)
+                    dominationCounts[i]+=1
+        
+        #peel off fronts: members of the next front are only dominated by earlier fronts
+        front=[i for i in range(n) if dominationCounts[i] == 0]
+        frontRankCnt=1
+        while front:
+            nextFront=[]
+            for i in front:
+                pop[i].frontRank=frontRankCnt
+                for j in dominatedSets[i]:
+                    dominationCounts[j]-=1
+                    if dominationCounts[j] == 0: nextFront.append(j)
+            front=nextFront
+            frontRankCnt+=1
+        
+        #group the population front by front, like computeFrontRanks
+        self.pop=sorted(pop,key=lambda ind: ind.frontRank)
+
+    def vectorizedNonDominatedSort(self):
+        """
+        Fast non-dominated sort on a NumPy objective array; the domination matrix
+        is built in row blocks so memory stays bounded for large populations
+        """
+        if len(self.pop) == 0: return
+        self.groupFronts(vectorizedFrontRanks(self.objectiveArray(),self.blockElements))
 
+    def biObjectiveNonDominatedSort(self):
+        """
+        Non-dominated sort for 2 objectives in O(N log N) (see biObjectiveFrontRanks),
+        falls back to vectorizedNonDominatedSort for other objective counts
+        """
+        if len(self.pop) == 0: return
+        if self.pop[0].numObj != 2: return self.vectorizedNonDominatedSort()
+        self.groupFronts(biObjectiveFrontRanks(self.objectiveArray()))
+
+    def objectiveArray(self):
+        return np.array([ind.objectives for ind in self.pop],dtype=float)
+
+    def groupFronts(self,ranks):
+        #assign the front ranks and group the population front by front, like computeFrontRanks
+        order=np.argsort(ranks,kind='stable')
+        newPop=[]
+        for i in order.tolist():
+            self.pop[i].frontRank=int(ranks[i])
+            newPop.append(self.pop[i])
+        self.pop=newPop
  
     def updateRanking(self):
         """
         Update front-rank and crowding distance for entire population
         """
-        self.computeFrontRanks()
-        self.computeCrowding()
+        rankingMethod=self.rankingMethod
+        if rankingMethod == 'auto':
+            rankingMethod='biobjective' if len(self.pop) > 0 and self.pop[0].numObj == 2 else 'numpy'
+        
+        if rankingMethod == 'original':
+            self.computeFrontRanks()
+        elif rankingMethod == 'fast':
+            self.fastNonDominatedSort()
+        elif rankingMethod == 'numpy':
+            self.vectorizedNonDominatedSort()
+        elif rankingMethod == 'biobjective':
+            self.biObjectiveNonDominatedSort()
+        else:
+            raise Exception('Unknown ranking method: ' + str(self.rankingMethod))
+        
+        if self.crowdingMethod == 'original':
+            self.computeCrowding()
+        elif self.crowdingMethod == 'knn':
+            self.knnCrowding()
+        else:
+            raise Exception('Unknown crowding method: ' + str(self.crowdingMethod))
     
     def binaryTournament(self,prng):
         """
@@ -271,21 +630,17 @@ class Population:
         #
         #It's your job to implement this function!
         #
-        indexList1 = list(range(len(self.pop)))
-        indexList2 = list(range(len(self.pop)))
-        prng.shuffle(indexList1)
-        prng.shuffle(indexList2)
-
-        # do not allow pop competition
-        for i in range(len(self.pop)):
-            if indexList1[i] == indexList2[i]:
-                temp = indexList2[i]
-                if i == 0:
-                    indexList2[i] = indexList2[-1]
-                    indexList2[-1] = temp
-                else:
-                    indexList2[i] = indexList2[i-1]
-                    indexList2[i-1] = temp
+        if self.tournamentMethod == 'rankAndCrowding':
+            # first occurrences of the winners are reused, repeated winners are cloned
+            winners=self.tournamentIndices(prng)
+            first=np.zeros(len(winners),dtype=bool)
+            first[np.unique(winners,return_index=True)[1]]=True
+            self.pop=[self.pop[i] if f else self.pop[i].clone() for i,f in zip(winners.tolist(),first.tolist())]
+            return
+        elif self.tournamentMethod != 'frontRank':
+            raise Exception('Unknown tournament method: ' + str(self.tournamentMethod))
+        
+        indexList1,indexList2=tournamentPairs(len(self.pop),prng)
         # compete
         newPop = []
         for index1, index2 in zip(indexList1, indexList2):
@@ -303,6 +658,14 @@ class Population:
         # overwrite old pop with newPop (i.e., the selected pop)   
         self.pop=newPop        
 
+    def tournamentIndices(self,prng,k=None):
+        """
+        Winner indices of k-way rank-and-crowding tournaments (default k: tournamentSize)
+        """
+        frontRank=np.array([ind.frontRank for ind in self.pop])
+        crowdDist=np.array([ind.crowdDist for ind in self.pop],dtype=float)
+        return crowdedTournament(frontRank,crowdDist,np.random.default_rng(prng.getrandbits(64)),k or self.tournamentSize)
+
     
     def generatePlots(self,title=None,showScreen=True,saveToFile=False,fileName=None):
         """
@@ -315,75 +678,225 @@ class Population:
                  in both state & objective space.  If state or objective
                  space dimensionality < 2, exception will be thrown
         """
-        
-        #first, make sure state & objective space have at least 2 dimensions, pop size at least 1
         if len(self.pop) < 1:
             raise Exception('showPlots error: Population size must be >= 1 !')
-        if (len(self.pop[0].state) < 2) or (len(self.pop[0].objectives) < 2):
-            raise Exception('showPlots error: State & objective spaces must have at least 2 dimensions!')
-    
-        #if front ranking has not been computed, then skip
-        # the front-rank plot
-        if self.pop[0].frontRank is None: plotOrder=[121,122,000]
-        else: plotOrder=[131,132,133]
-        
-        #top-level attributes for collection of subplots
-        if title is not None:
-            fig, axs = plt.subplots(13)
-            fig.suptitle(title)
-        plt.subplots_adjust(wspace=0.75) #increase spacing between plots a bit
-        
-        #individuals in state space
-        plt.subplot(plotOrder[0])
-        x=[ind.state[0] for ind in self.pop]
-        y=[ind.state[1] for ind in self.pop]
-        plt.scatter(x,y)
-        plt.xlabel('x1')
-        plt.ylabel('x2')
-        plt.title('State Space')
-        
-        
-        #individuals in objective space
-        plt.subplot(plotOrder[1])
-        x=[ind.objectives[0] for ind in self.pop]
-        y=[ind.objectives[1] for ind in self.pop]
-        plt.scatter(x,y)
-        plt.xlabel('f1')
-        plt.ylabel('f2')
-        plt.title('Objective Space')
-        
+        state=np.array([ind.state for ind in self.pop],dtype=float)
+        frontRank=None if self.pop[0].frontRank is None else np.array([ind.frontRank for ind in self.pop])
+        plotPopulation(state,self.objectiveArray(),frontRank,title,showScreen,saveToFile,fileName)
+    
+    def __str__(self):
+        """
+        Stringify magic method
+        """
+        s=''
+        for ind in self.pop:
+            s+=str(ind)+'\n'
+        return s
+      
+#
+# Lightweight view of one row of an ArrayPopulation, usable wherever an
+#  Individual is read (dominates, compareRankAndCrowding, distance)
+#
+class IndividualView:
+    __slots__=('population','index')
+    
+    def __init__(self,population,index):
+        """
+        IndividualView Ctor
+        """
+        self.population=population
+        self.index=index
+    
+    @property
+    def state(self):
+        return self.population.state[self.index]
+    
+    @property
+    def objectives(self):
+        return self.population.objectives[self.index]
+    
+    @property
+    def numObj(self):
+        return self.population.objectives.shape[1]
+    
+    @property
+    def frontRank(self):
+        ranks=self.population.frontRank
+        return None if ranks is None else int(ranks[self.index])
+    
+    @property
+    def crowdDist(self):
+        dists=self.population.crowdDist
+        return None if dists is None else float(dists[self.index])
+    
+    dominates=Individual.dominates
+    compareRankAndCrowding=Individual.compareRankAndCrowding
+    distance=Individual.distance
+    
+    def __str__(self):
+        """
+        Stringify magic method
+        """
+        s=''
+        s+='state     : ' + str(self.state.tolist()) + '\n'
+        s+='objectives: ' + str(self.objectives.tolist()) + '\n'
+        s+='frontRank : ' + str(self.frontRank) + '\n'
+        s+='crowdDist : ' + str(self.crowdDist) + '\n'
+        return s
+
+
+#
+# Population stored as arrays: state (N,S), objectives (N,M), and the
+#  parallel frontRank/crowdDist arrays (None until updateRanking), with the
+#  same ranking, tournament and plotting operators as Population
+#
+class ArrayPopulation:
+    #front-ranking engine used by updateRanking: 'numpy', 'biobjective',
+    # or 'auto' (biobjective for 2 objectives, numpy otherwise)
+    rankingMethod='auto'
+    #crowding metric: 'knn' (same as Population.knnCrowding) or 'cuboid' (NSGA-II)
+    crowdingMethod='knn'
+    #binaryTournament mode, as in Population
+    tournamentMethod='frontRank'
+    tournamentSize=2
+    
+    def __init__(self,state,objectives):
+        """
+        ArrayPopulation Ctor
+        """
+        self.state=np.asarray(state,dtype=float)
+        self.objectives=np.asarray(objectives,dtype=float)
+        self.frontRank=None
+        self.crowdDist=None
+    
+    @classmethod
+    def fromIndividuals(cls,pop):
+        return cls([ind.state for ind in pop],[ind.objectives for ind in pop])
+    
+    def __len__(self):
+        return len(self.objectives)
+    
+    def __getitem__(self,index):
+        return IndividualView(self,index)
+    
+    @property
+    def pop(self):
+        return [IndividualView(self,i) for i in range(len(self))]
+    
+    def take(self,indices):
+        #keep the given rows (repeats allowed), in the given order
+        self.state=self.state[indices]
+        self.objectives=self.objectives[indices]
+        if self.frontRank is not None: self.frontRank=self.frontRank[indices]
+        if self.crowdDist is not None: self.crowdDist=self.crowdDist[indices]
+    
+    def rankFronts(self):
+        """
+        Compute the front ranks (without regrouping the population)
+        """
+        numObj=self.objectives.shape[1]
+        rankingMethod=self.rankingMethod
+        if rankingMethod == 'auto':
+            rankingMethod='biobjective' if numObj == 2 else 'numpy'
+        
+        if rankingMethod == 'numpy' or (rankingMethod == 'biobjective' and numObj != 2):
+            self.frontRank=vectorizedFrontRanks(self.objectives,Population.blockElements)
+        elif rankingMethod == 'biobjective':
+            self.frontRank=biObjectiveFrontRanks(self.objectives)
+        else:
+            raise Exception('Unknown ranking method: ' + str(self.rankingMethod))
+    
+    def updateRanking(self):
+        """
+        Update front-rank and crowding distance for entire population
+        """
+        if len(self) == 0: return
+        self.crowdDist=None
+        self.rankFronts()
         
-        #Note: If front ranks have not been computed, then
-        #      skip the frontRank plot...
-        if self.pop[0].frontRank is not None:
-            #non-dominated ranked fronts in objective space
-            plt.subplot(plotOrder[2])   
-            
-            #first, let's find highest front rank
-            maxRank=0
-            for ind in self.pop:
-                if ind.frontRank > maxRank: maxRank=ind.frontRank
-            
-            rank=0
-            while rank <= maxRank:
-                xy=[ind.objectives for ind in self.pop if ind.frontRank == rank]
-                xy.sort(key=lambda obj: obj[0]) #need to sort in 1st dim to make connected line plots look sensible!
-                x=[obj[0] for obj in xy]
-                y=[obj[1] for obj in xy]
-                plt.plot(x,y,marker='o',label=str(rank))
-                rank+=1
-                
-            plt.xlabel('f1')
-            plt.ylabel('f2')
-            plt.title('Ranked Fronts')
+        #group the population front by front, like Population
+        self.take(np.argsort(self.frontRank,kind='stable'))
+        self.crowdDist=self.crowdingDistances(self.objectives)
+    
+    def crowdingDistances(self,obj):
+        if self.crowdingMethod == 'knn':
+            return knnCrowdingDistances(obj,Population.blockElements)
+        elif self.crowdingMethod == 'cuboid':
+            return cuboidCrowdingDistances(obj)
+        else:
+            raise Exception('Unknown crowding method: ' + str(self.crowdingMethod))
+    
+    def combinePops(self,otherPop):
+        self.state=np.concatenate((self.state,otherPop.state))
+        self.objectives=np.concatenate((self.objectives,otherPop.objectives))
+        self.frontRank=None
+        self.crowdDist=None
     
-        #write plots to file?
-        if saveToFile:
-            plt.savefig(fileName)
+    def truncateSelect(self,newPopSize):
+        """
+        Elitist survivor selection on ranked fronts: whole fronts are kept while
+        they fit, the last one is truncated to its least crowded members
+        (rankFronts must have been called); survivors are grouped front by front,
+        with crowding distances computed within each front (NSGA-II)
+        """
+        order=np.argsort(self.frontRank,kind='stable')
+        lastDist=np.empty(0)
+        if newPopSize < len(self):
+            lastRank=self.frontRank[order[newPopSize-1]]
+            kept=order[self.frontRank[order] < lastRank]
+            lastFront=order[self.frontRank[order] == lastRank]
+            crowdDist=self.crowdingDistances(self.objectives[lastFront])
+            best=np.argsort(-crowdDist,kind='stable')[:newPopSize-len(kept)]
+            order=np.concatenate((kept,lastFront[best]))
+            lastDist=crowdDist[best]
+        self.crowdDist=None
+        self.take(order)
+        
+        #the truncated last front keeps the distances it was truncated by
+        n=len(self)-len(lastDist)
+        crowdDist=np.empty(len(self))
+        crowdDist[n:]=lastDist
+        bounds=np.flatnonzero(np.diff(self.frontRank[:n]))+1
+        for start,end in zip([0]+bounds.tolist(),bounds.tolist()+[n]):
+            if end > start: crowdDist[start:end]=self.crowdingDistances(self.objectives[start:end])
+        self.crowdDist=crowdDist
+    
+    def binaryTournament(self,prng):
+        """
+        Binary tournament on front ranks, same pairing and tie-breaking as
+        Population.binaryTournament (or k-way rank-and-crowding tournaments,
+        see tournamentMethod), winners are kept as rows (no copies of objects)
+        """
+        if self.tournamentMethod == 'rankAndCrowding':
+            self.take(self.tournamentIndices(prng))
+            return
+        elif self.tournamentMethod != 'frontRank':
+            raise Exception('Unknown tournament method: ' + str(self.tournamentMethod))
         
-        #display on screen?
-        if showScreen:
-            plt.show()
+        indexList1,indexList2=tournamentPairs(len(self),prng)
+        ranks=self.frontRank.tolist()
+        winners=[]
+        for index1, index2 in zip(indexList1, indexList2):
+            if ranks[index1] < ranks[index2]:
+                winners.append(index1)
+            elif ranks[index1] > ranks[index2]:
+                winners.append(index2)
+            else:
+                rn = prng.random()
+                winners.append(index1 if rn > 0.5 else index2)
+        self.take(winners)
+    
+    def tournamentIndices(self,prng,k=None):
+        """
+        Winner indices of k-way rank-and-crowding tournaments (default k: tournamentSize)
+        """
+        return crowdedTournament(self.frontRank,self.crowdDist,np.random.default_rng(prng.getrandbits(64)),k or self.tournamentSize)
+    
+    def generatePlots(self,title=None,showScreen=True,saveToFile=False,fileName=None):
+        """
+        Same plots as Population.generatePlots
+        """
+        plotPopulation(self.state,self.objectives,self.frontRank,title,showScreen,saveToFile,fileName)
     
     def __str__(self):
         """
@@ -393,6 +906,7 @@ class Population:
         for ind in self.pop:
             s+=str(ind)+'\n'
         return s
+
       
 #
 #Random Population initializer based on Deb's MinEx benchmark
@@ -425,6 +939,27 @@ def minExInitializer(popSize,prng):
     return population
 
 
+#
+#MinEx initializer for ArrayPopulation, draws the same population as
+# minExInitializer for the same prng state without building Individuals
+#
+def minExArrayInitializer(popSize,prng):
+    state=np.empty((popSize,2))
+    for i in range(popSize):
+        state[i,0]=prng.uniform(0.1,1.0)
+        state[i,1]=prng.uniform(0.0,5.0)
+    return ArrayPopulation(state,minExObjectives(state))
+
+
+#
+#MinEx objectives of an (N,2) state array
+#
+def minExObjectives(state):
+    x1=state[:,0]
+    x2=state[:,1]
+    return np.column_stack((x1,(1+x2)/x1))
+
+
 #
 #Let's test our binary selection operator by iteratively
 # applying it to an initial random population.  Examine
@@ -0,0 +1,238 @@
+#
+# nsga2_hw7.py: NSGA-II style elitist multi-objective EA on Deb's MinEx
+#  problem, built on the EC_hw7_cky ranking/crowding primitives
+#
+#
+# To run: python nsga2_hw7.py --input nsga2_parameters.cfg
+#
+# Generation loop (population stored as arrays, see ArrayPopulation):
+#   - mating selection: k-way tournaments on front rank, then crowding distance
+#   - variation: SBX crossover + polynomial mutation of the 2-D real state
+#   - evaluation: MinEx objectives of the offspring
+#   - ranking: non-dominated fronts of parents+offspring (O(N log N) for 2 objectives)
+#   - survivor selection: whole fronts while they fit, the last front is
+#     truncated by crowding (NSGA-II cuboid or k-nearest-neighbor distance)
+# Time spent in every phase is reported at the end of the run.
+#
+
+import optparse
+import sys
+import yaml
+import time
+import numpy as np
+from random import Random
+from EC_hw7_cky import *
+
+
+#NSGA2 Config class
+class NSGA2_Config:
+    """
+    NSGA2 configuration class
+    """
+    # class variables
+    sectionName='NSGA2'
+    options={'populationSize': (int,True),
+             'generationCount': (int,True),
+             'randomSeed': (int,True),
+             'crossoverFraction': (float,True),
+             'crossoverEta': (float,False),
+             'mutationEta': (float,False),
+             'mutationRate': (float,False),
+             'tournamentSize': (int,False),
+             'rankingMethod': (str,False),
+             'crowdingMethod': (str,False),
+             'reportInterval': (int,False),
+             'plotFile': (str,False),
+             'showPlots': (bool,False)}
+
+    #constructor
+    def __init__(self, inFileName):
+        #read YAML config and get NSGA2 section
+        infile=open(inFileName,'r')
+        ymlcfg=yaml.safe_load(infile)
+        infile.close()
+        eccfg=ymlcfg.get(self.sectionName,None)
+        if eccfg is None: raise Exception('Missing {} section in cfg file'.format(self.sectionName))
+
+        #iterate over options
+        for opt in self.options:
+            if opt in eccfg:
+                optval=eccfg[opt]
+
+                #verify parameter type
+                if type(optval) != self.options[opt][0]:
+                    raise Exception('Parameter "{}" has wrong type'.format(opt))
+
+                #create attributes on the fly
+                setattr(self,opt,optval)
+            else:
+                if self.options[opt][1]:
+                    raise Exception('Missing mandatory parameter "{}"'.format(opt))
+                else:
+                    setattr(self,opt,None)
+
+    #string representation for class data
+    def __str__(self):
+        return str(yaml.dump(self.__dict__,default_flow_style=False))
+
+
+#MinEx state limits (x1, x2)
+minExLower=np.array([0.1,0.0])
+minExUpper=np.array([1.0,5.0])
+
+
+#
+#Simulated binary crossover of consecutive mating-pool rows (0,1), (2,3), ...,
+# each pair is recombined with probability crossoverFraction
+#
+def sbxCrossover(state,crossoverFraction,eta,rng):
+    child=state.copy()
+    nPairs=len(state)//2
+    p1=state[0:2*nPairs:2]
+    p2=state[1:2*nPairs:2]
+
+    #spread factor per variable
+    u=rng.random(p1.shape)
+    beta=np.where(u <= 0.5,(2*u)**(1/(eta+1)),(1/(2*(1-u)))**(1/(eta+1)))
+    mask=(rng.random(nPairs) < crossoverFraction)[:,None]
+    child[0:2*nPairs:2]=np.where(mask,0.5*((1+beta)*p1+(1-beta)*p2),p1)
+    child[1:2*nPairs:2]=np.where(mask,0.5*((1-beta)*p1+(1+beta)*p2),p2)
+    return np.clip(child,minExLower,minExUpper,out=child)
+
+
+#
+#Polynomial mutation, every variable is mutated with probability mutationRate
+#
+def polynomialMutation(state,mutationRate,eta,rng):
+    u=rng.random(state.shape)
+    delta=np.where(u < 0.5,(2*u)**(1/(eta+1))-1,1-(2*(1-u))**(1/(eta+1)))
+    mask=rng.random(state.shape) < mutationRate
+    state+=np.where(mask,delta*(minExUpper-minExLower),0.0)
+    return np.clip(state,minExLower,minExUpper,out=state)
+
+
+#Print per-generation progress
+def printStats(population,gen):
+    front=population.objectives[population.frontRank == 1]
+    print('Generation:',gen)
+    print('Front 1 size',len(front))
+    print('Number of fronts',int(population.frontRank.max()))
+    print('Min objectives',front.min(axis=0).tolist())
+    print('')
+
+
+#Print total and per-generation time of every phase
+def printTimings(timings,generationCount):
+    print('{:>20s} {:>12s} {:>14s}'.format('phase','total','per generation'))
+    for phase,seconds in timings.items():
+        print('{:>20s} {:>11.3f}s {:>13.5f}s'.format(phase,seconds,seconds/max(1,generationCount)))
+    print('{:>20s} {:>11.3f}s'.format('all',sum(timings.values())))
+
+
+#NSGA-II:
+#
+def nsga2(cfg):
+    #start random number generators
+    prng=Random()
+    prng.seed(cfg.randomSeed)
+    rng=np.random.default_rng(cfg.randomSeed)
+
+    crossoverEta=cfg.crossoverEta if cfg.crossoverEta is not None else 15.0
+    mutationEta=cfg.mutationEta if cfg.mutationEta is not None else 20.0
+    mutationRate=cfg.mutationRate if cfg.mutationRate is not None else 1.0/len(minExLower)
+    if cfg.rankingMethod is not None: ArrayPopulation.rankingMethod=cfg.rankingMethod
+    if cfg.crowdingMethod is not None: ArrayPopulation.crowdingMethod=cfg.crowdingMethod
+
+    timings=dict((phase,0.0) for phase in ('initialization','mating selection','variation','evaluation','ranking','survivor selection'))
+
+    #create initial Population (random initialization)
+    start=time.perf_counter()
+    population=minExArrayInitializer(cfg.populationSize,prng)
+    population.rankFronts()
+    population.truncateSelect(cfg.populationSize)     #front grouping and per-front crowding, nothing is dropped
+    timings['initialization']+=time.perf_counter()-start
+    if cfg.reportInterval: printStats(population,0)
+
+    #evolution main loop
+    for i in range(cfg.generationCount):
+        start=time.perf_counter()
+        pool=population.tournamentIndices(prng,cfg.tournamentSize or 2)
+
+        phase=time.perf_counter()
+        timings['mating selection']+=phase-start
+        start=phase
+        childState=sbxCrossover(population.state[pool],cfg.crossoverFraction,crossoverEta,rng)
+        polynomialMutation(childState,mutationRate,mutationEta,rng)
+
+        phase=time.perf_counter()
+        timings['variation']+=phase-start
+        start=phase
+        offspring=ArrayPopulation(childState,minExObjectives(childState))
+
+        phase=time.perf_counter()
+        timings['evaluation']+=phase-start
+        start=phase
+        population.combinePops(offspring)
+        population.rankFronts()
+
+        phase=time.perf_counter()
+        timings['ranking']+=phase-start
+        start=phase
+        population.truncateSelect(cfg.populationSize)
+        timings['survivor selection']+=time.perf_counter()-start
+
+        if cfg.reportInterval and (i+1) % cfg.reportInterval == 0: printStats(population,i+1)
+
+    printTimings(timings,cfg.generationCount)
+
+    #final population plots
+    if cfg.plotFile is not None or cfg.showPlots:
+        population.generatePlots(title='Generation: ' + str(cfg.generationCount),showScreen=bool(cfg.showPlots),saveToFile=cfg.plotFile is not None,fileName=cfg.plotFile)
+
+    return population
+
+
+#
+# Main entry point
+#
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+
+    try:
+        #
+        # get command-line options
+        #
+        parser = optparse.OptionParser()
+        parser.add_option("-i", "--input", action="store", dest="inputFileName", help="input filename", default=None)
+        parser.add_option("-q", "--quiet", action="store_true", dest="quietMode", help="quiet mode", default=False)
+        parser.add_option("-d", "--debug", action="store_true", dest="debugMode", help="debug mode", default=False)
+        (options, args) = parser.parse_args(argv)
+
+        #validate options
+        if options.inputFileName is None:
+            raise Exception("Must specify input file name using -i or --input option.")
+
+        #Get NSGA2 config params
+        cfg=NSGA2_Config(options.inputFileName)
+
+        #print config params
+        print(cfg)
+
+        #run NSGA-II
+        nsga2(cfg)
+
+        if not options.quietMode:
+            print('NSGA-II Completed!')
+
+    except Exception as info:
+        if 'options' in vars() and options.debugMode:
+            from traceback import print_exc
+            print_exc()
+        else:
+            print(info)
+
+
+if __name__ == '__main__':
+    main()
+
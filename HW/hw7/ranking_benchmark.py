@@ -0,0 +1,59 @@
+#
+# ranking_benchmark.py: timing comparison of the front-ranking engines
+#  on random MinEx populations
+#
+# To run: python ranking_benchmark.py
+#         python ranking_benchmark.py --sizes 500,5000,50000 --max-original 500
+#         python ranking_benchmark.py --sizes 50000,500000 --max-numpy 50000
+#
+
+import optparse
+import sys
+import copy
+import time
+from random import Random
+from EC_hw7_cky import *
+
+
+#largest population each engine is timed on by default (larger ones are skipped)
+defaultLimits={'original': 500, 'fast': 5000, 'numpy': 50000, 'biobjective': 1000000}
+
+engines=[('original','computeFrontRanks'),
+         ('fast','fastNonDominatedSort'),
+         ('numpy','vectorizedNonDominatedSort'),
+         ('biobjective','biObjectiveNonDominatedSort')]
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+
+    parser = optparse.OptionParser()
+    parser.add_option("-s", "--sizes", action="store", dest="sizes", help="comma separated population sizes", default='500,5000,50000')
+    parser.add_option("--max-original", action="store", type="int", dest="maxOriginal", default=defaultLimits['original'])
+    parser.add_option("--max-fast", action="store", type="int", dest="maxFast", default=defaultLimits['fast'])
+    parser.add_option("--max-numpy", action="store", type="int", dest="maxNumpy", default=defaultLimits['numpy'])
+    parser.add_option("--max-biobjective", action="store", type="int", dest="maxBiobjective", default=defaultLimits['biobjective'])
+    parser.add_option("-r", "--seed", action="store", type="int", dest="seed", default=456)
+    (options, args) = parser.parse_args(argv)
+
+    limits={'original': options.maxOriginal, 'fast': options.maxFast, 'numpy': options.maxNumpy, 'biobjective': options.maxBiobjective}
+
+    rowFormat='{:>8}'+' {:>12s}'*len(engines)
+    print(rowFormat.format('popSize',*[name for name,method in engines]))
+    for popSize in [int(size) for size in options.sizes.split(',')]:
+        base=minExInitializer(popSize,Random(options.seed))
+        row=[]
+        for name,method in engines:
+            if popSize > limits[name]:
+                row.append('skipped')
+                continue
+            pop=Population(copy.deepcopy(base))
+            start=time.perf_counter()
+            getattr(pop,method)()
+            row.append('%0.4fs'%(time.perf_counter()-start))
+        print(rowFormat.format(popSize,*row))
+
+
+if __name__ == '__main__':
+    main()
@@ -10,15 +10,19 @@
 #   - Uses binary tournament selection for mating pool
 #   - Uses elitist truncation selection for survivors
 #   - Supports IntegerVector and Multivariate Individual types
+#   - Parallel fitness evaluation on a process pool (numWorkers > 1)
+#   - Optional streamed CSV/JSON-lines generation stats (statsFile)
 #
 
 import optparse
 import sys
 import yaml
 import math
+import numpy as np
 from random import Random
 from Population import *
 from Evaluator import *
+from GenerationStats import GenerationStats
 
 from multiprocessing import Pool
 
@@ -42,7 +46,13 @@ class EV3_Config:
              'rastriginA': (float,False),
              'rastriginN': (int,False),
              'minLimit': (float,False),
-             'maxLimit': (float,False)}
+             'maxLimit': (float,False),
+             'numWorkers': (int,False),
+             'tournamentSize': (int,False),
+             'truncationMethod': (str,False),
+             'statsFile': (str,False),
+             'statsFormat': (str,False),
+             'dumpInterval': (int,False)}
      
     #constructor
     def __init__(self, inFileName):
@@ -95,26 +105,14 @@ def printStats(pop,gen):
     print('')
 
 
-#EV3:
-#            
-def ev3(cfg):
-    #start random number generators
-    uniprng=Random()
-    uniprng.seed(cfg.randomSeed)
-    normprng=Random()
-    normprng.seed(cfg.randomSeed+101)
-
-    #set static params on classes
-    # (probably not the most elegant approach, but let's keep things simple...)
-    Individual.uniprng=uniprng
-    Individual.normprng=normprng
-    Population.uniprng=uniprng
-    Population.crossoverFraction=cfg.crossoverFraction
-
+#Set evaluator and individual-type params on classes
+# (also used as the worker initializer of the evaluation pool)
+def configureEvaluator(cfg):
     if cfg.evaluator == 'particles1d':
         Particles1D.selfEnergy=cfg.selfEnergy
         Particles1D.interactionEnergy=cfg.interactionEnergy
         IntVectorIndividual.fitFunc=Particles1D.fitnessFunc
+        IntVectorIndividual.batchFitFunc=Particles1D.batchFitnessFunc
         IntVectorIndividual.nLength=cfg.latticeLength
         IntVectorIndividual.nItems=cfg.numParticleTypes
         IntVectorIndividual.learningRate=1.0/math.sqrt(cfg.latticeLength)
@@ -127,24 +125,73 @@ def ev3(cfg):
         MultivariateIndividual.minLimit=cfg.minLimit
         MultivariateIndividual.maxLimit=cfg.maxLimit
         MultivariateIndividual.fitFunc=Rastrigin.fitnessFunc
+        MultivariateIndividual.batchFitFunc=Rastrigin.batchFitnessFunc
         MultivariateIndividual.nLength=cfg.rastriginN
         MultivariateIndividual.learningRate=1.0/math.sqrt(cfg.rastriginN)
         Population.individualType=MultivariateIndividual
     else:
         raise Exception('Unknown evaluator type: ' + str(cfg.evaluator))
-      
-    
+
+
+#EV3:
+#  callback: optional function receiving each generation's stats record
+#            
+def ev3(cfg,callback=None):
+    #start random number generators
+    uniprng=Random()
+    uniprng.seed(cfg.randomSeed)
+    normprng=Random()
+    normprng.seed(cfg.randomSeed+101)
+
+    #set static params on classes
+    # (probably not the most elegant approach, but let's keep things simple...)
+    Individual.uniprng=uniprng
+    Individual.normprng=normprng
+    Population.uniprng=uniprng
+    Population.crossoverFraction=cfg.crossoverFraction
+    Population.rng=np.random.default_rng(cfg.randomSeed)
+    Population.tournamentSize=cfg.tournamentSize or 2
+    if cfg.truncationMethod is not None:
+        if cfg.truncationMethod not in ('sort','partial'): raise Exception('Unknown truncation method: ' + str(cfg.truncationMethod))
+        Population.truncationMethod=cfg.truncationMethod
+    configureEvaluator(cfg)
+    Population.takeEvaluationCounts()
+
+    #start the persistent evaluation worker pool, once per run
+    if cfg.numWorkers is not None and cfg.numWorkers > 1:
+        Population.pool=Pool(cfg.numWorkers,initializer=configureEvaluator,initargs=(cfg,))
+        Population.numWorkers=cfg.numWorkers
+
+    #per-generation reporting: legacy full printout, or streamed stats records
+    if cfg.statsFile is None and callback is None:
+        stats=None
+        report=printStats
+    else:
+        stats=GenerationStats(cfg.statsFile,cfg.statsFormat or 'csv',callback,cfg.dumpInterval,counters=Population.takeEvaluationCounts)
+        report=stats.record
+    try:
+        evolve(cfg,report)
+    finally:
+        if stats is not None: stats.close()
+        if Population.pool is not None:
+            Population.pool.close()
+            Population.pool.join()
+            Population.pool=None
+
+
+#EV3 generation loop
+#
+def evolve(cfg,report):
     #create initial Population (random initialization)
     population=Population(cfg.populationSize)
         
     #print initial pop stats    
-    printStats(population,0)
+    report(population,0)
 
     #evolution main loop
     for i in range(cfg.generationCount):
         #create initial offspring population by copying parent pop
         offspring=population.copy()
-        offspring.evaluateFitness()
         
         #select mating pool
         offspring.conductTournament()
@@ -164,7 +211,7 @@ def ev3(cfg):
         population.truncateSelect(cfg.populationSize)
         
         #print population stats    
-        printStats(population,i+1)
+        report(population,i+1)
         
         
 #
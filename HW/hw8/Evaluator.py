@@ -1,5 +1,6 @@
 
 import math
+import numpy as np
 
 
 #1-D lattice total energy function evaluator class
@@ -21,6 +22,26 @@ class Particles1D:
             
         return -totalEnergy
 
+    @classmethod
+    def energyTables(cls):
+        #NumPy copies of selfEnergy/interactionEnergy, rebuilt if the class attributes are reassigned
+        key=(id(cls.selfEnergy),id(cls.interactionEnergy))
+        if getattr(cls,'_tableKey',None) != key:
+            cls._selfTable=np.asarray(cls.selfEnergy)
+            cls._interactionTable=np.asarray(cls.interactionEnergy)
+            cls._tableKey=key
+        return cls._selfTable,cls._interactionTable
+
+    @classmethod
+    def batchFitnessFunc(cls,states):
+        #states: 2-D (numStates, latticeLength) integer array, returns a fitness vector
+        states=np.asarray(states)
+        selfTable,interactionTable=cls.energyTables()
+        totalEnergy=selfTable[states].sum(axis=1)
+        #each neighbour pair is counted once from either side
+        totalEnergy+=2*interactionTable[states[:,:-1],states[:,1:]].sum(axis=1)
+        return -totalEnergy
+
 
 #Multi-dimensional Rastrigin function evaluator class
 #
@@ -36,3 +57,10 @@ class Rastrigin:
             fitness+=state[i]*state[i] - cls.A*math.cos(2.0*math.pi*state[i])
             
         return -fitness
+
+    @classmethod
+    def batchFitnessFunc(cls,states):
+        #states: 2-D (numStates, nVars) real array, returns a fitness vector
+        x=np.asarray(states,dtype=float)[:,:cls.nVars]
+        fitness=cls.A*cls.nVars+(x*x-cls.A*np.cos(2.0*np.pi*x)).sum(axis=1)
+        return -fitness
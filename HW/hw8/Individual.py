@@ -17,6 +17,7 @@ class Individual:
     uniprng=None
     normprng=None
     fitFunc=None
+    batchFitFunc=None
 
     def __init__(self):
         self.fit=self.__class__.fitFunc(self.state)
@@ -30,6 +31,14 @@ class Individual:
     def evaluateFitness(self):
         if self.fit == None: self.fit=self.__class__.fitFunc(self.state)
 
+    def clone(self):
+        #cheap copy of the per-individual data only (no deepcopy, no ctor/evaluation)
+        other=self.__class__.__new__(self.__class__)
+        other.state=list(self.state)
+        other.fit=self.fit
+        other.mutRate=self.mutRate
+        return other
+
 
 #A combinatorial integer representation class
 #
@@ -48,24 +57,31 @@ class IntVectorIndividual(Individual):
         super().__init__() #call base class ctor
         
     def crossover(self, other):
-        #perform crossover "in-place"
+        #perform crossover "in-place", swapping equal genes changes nothing
+        changed=False
         for i in range(self.nLength):
-            if self.uniprng.random() < 0.5:
+            if self.uniprng.random() < 0.5 and self.state[i] != other.state[i]:
                 tmp=self.state[i]
                 self.state[i]=other.state[i]
                 other.state[i]=tmp
+                changed=True
                         
-        self.fit=None
-        other.fit=None
+        if changed:
+            self.fit=None
+            other.fit=None
     
     def mutate(self):
         self.mutateMutRate() #update mutation rate
         
+        changed=False
         for i in range(self.nLength):
             if self.uniprng.random() < self.mutRate:
-                self.state[i]=self.uniprng.randint(0,self.nItems-1)
+                value=self.uniprng.randint(0,self.nItems-1)
+                if value != self.state[i]:
+                    self.state[i]=value
+                    changed=True
         
-        self.fit=None
+        if changed: self.fit=None
             
     def __str__(self):
         return str(self.state)+'\t'+'%0.8e'%self.fit+'\t'+'%0.8e'%self.mutRate
@@ -91,6 +107,8 @@ class MultivariateIndividual(Individual):
     def crossover(self, other):
         #perform crossover "in-place"
         alpha=self.uniprng.random()
+        selfState=list(self.state)
+        otherState=list(other.state)
         
         for i in range(self.nLength):
             tmp=self.state[i]*alpha+other.state[i]*(1-alpha)
@@ -102,8 +120,9 @@ class MultivariateIndividual(Individual):
             if other.state[i] > self.maxLimit: other.state[i]=self.maxLimit
             if other.state[i] < self.minLimit: other.state[i]=self.minLimit
         
-        self.fit=None
-        other.fit=None
+        #only re-evaluate genomes that actually changed (e.g. not identical parents)
+        if self.state != selfState: self.fit=None
+        if other.state != otherState: other.fit=None
     
     def mutate(self):
         self.mutateMutRate() #update mutation rate
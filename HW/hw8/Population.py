@@ -5,12 +5,63 @@
 
 import copy
 import math
+import numpy as np
 from operator import attrgetter
 from Individual import *
 
-import multiprocessing
-from multiprocessing import Pool
-from multiprocessing import Process
+
+#Worker-side scoring of one chunk of states (runs inside a Pool process,
+# whose evaluator/individual classes were configured by the pool initializer)
+def evaluateStates(states):
+    indType=Population.individualType
+    if indType.batchFitFunc is not None:
+        return indType.batchFitFunc(np.array(states)).tolist()
+    return [indType.fitFunc(state) for state in states]
+
+
+#k-way tournament selection on a fitness-like key (larger wins): every
+# individual enters k tournaments (one random permutation per entrant slot,
+# nobody meets itself), ties go to a random entrant.  Returns the winner
+# indices so the caller can gather the winners in one take.
+#
+def tournamentSelect(key,rng,k=2):
+    n=len(key)
+    if k < 2 or k > n: raise Exception('Invalid tournament size: ' + str(k))
+    entrants=np.empty((n,k),dtype=np.intp)
+    for j in range(k):
+        col=entrants[:,j]
+        col[:]=rng.permutation(n)
+        # do not allow self competition: swap clashing entries with random rows
+        while j > 0:
+            clash=np.flatnonzero((entrants[:,:j] == col[:,None]).any(axis=1))
+            if len(clash) == 0: break
+            for i in clash.tolist():
+                r=int(rng.integers(n))
+                col[i],col[r]=col[r],col[i]
+
+    #compete
+    keys=key[entrants]
+    tie=np.where(keys == keys.max(axis=1)[:,None],rng.random((n,k)),-1.0)
+    return entrants[np.arange(n),tie.argmax(axis=1)]
+
+
+#Indices of the k best individuals by partial selection (argpartition, no
+# full sort), in no particular order.  With a primary key (e.g. penalty) the
+# ranking is lexicographic: larger primary first, then larger fit.
+#
+def topIndices(fit,k,primary=None):
+    n=len(fit)
+    if k >= n: return np.arange(n)
+    if primary is None: return np.argpartition(-fit,k-1)[:k]
+
+    #everyone strictly above the k-th best primary value is in,
+    # the remaining slots go to the fittest of those tied with it
+    threshold=np.partition(-primary,k-1)[k-1]
+    above=np.flatnonzero(-primary < threshold)
+    tied=np.flatnonzero(-primary == threshold)
+    need=k-len(above)
+    if need < len(tied): tied=tied[np.argpartition(-fit[tied],need-1)[:need]]
+    return np.concatenate((above,tied))
 
 
 class Population:
@@ -18,8 +69,14 @@ class Population:
     Population
     """
     uniprng=None
+    rng=None    #NumPy Generator for tournament selection
+    tournamentSize=2
+    truncationMethod='sort'     #'sort': full sort, 'partial': partial selection of the survivors
     crossoverFraction=None
     individualType=None
+    pool=None
+    numWorkers=1
+    evaluationCounts={'evaluations': 0}     #fitness computations since the last takeEvaluationCounts()
     
     def __init__(self, populationSize):
         """
@@ -28,6 +85,7 @@ class Population:
         self.population=[]
         for i in range(populationSize):
             self.population.append(self.__class__.individualType())                                                                                                                                        
+        self.evaluationCounts['evaluations']+=populationSize    #individuals evaluate themselves on construction
 
     def __len__(self):
         return len(self.population)
@@ -41,13 +99,29 @@ class Population:
     def copy(self):
         return copy.deepcopy(self)
             
-    def evaluateFitness(self):                                            
-        #for individual in self.population : individual.evaluateFitness()
-        #self.population[0].fit / self.population[0].state
-        for st in self.population:
-            p1=Process(target=st.evaluateFitness(), args=(st.state))
-            p1.start()
-        p1.join()
+    @classmethod
+    def takeEvaluationCounts(cls):
+        #evaluation counts since the previous call, as extra per-generation stats fields
+        counts=dict(cls.evaluationCounts)
+        for name in cls.evaluationCounts: cls.evaluationCounts[name]=0
+        return counts
+
+    def evaluateFitness(self):
+        pending=[individual for individual in self.population if individual.fit is None]
+        if len(pending) == 0: return
+        self.evaluationCounts['evaluations']+=len(pending)
+        states=[individual.state for individual in pending]
+
+        if self.pool is not None:
+            #parallel: a few chunks per worker to balance load without per-state IPC
+            chunkSize=max(1,math.ceil(len(states)/(4*self.numWorkers)))
+            chunks=[states[k:k+chunkSize] for k in range(0,len(states),chunkSize)]
+            fits=[fit for chunkFits in self.pool.map(evaluateStates,chunks) for fit in chunkFits]
+        else:
+            #serial: score every individual whose fit is None in one batch call
+            fits=evaluateStates(states)
+
+        for individual,fit in zip(pending,fits): individual.fit=fit
         
 
     def mutate(self):     
@@ -71,46 +145,27 @@ class Population:
         
             
     def conductTournament(self):
-        # binary tournament
-        indexList1=list(range(len(self)))
-        indexList2=list(range(len(self)))
-        
-        self.uniprng.shuffle(indexList1)
-        self.uniprng.shuffle(indexList2)
-        
-        # do not allow self competition
-        for i in range(len(self)):
-            if indexList1[i] == indexList2[i]:
-                temp=indexList2[i]
-                if i == 0:
-                    indexList2[i]=indexList2[-1]
-                    indexList2[-1]=temp
-                else:
-                    indexList2[i]=indexList2[i-1]
-                    indexList2[i-1]=temp
-        
-        #compete
-        newPop=[]        
-        for index1,index2 in zip(indexList1,indexList2):
-            if self[index1].fit > self[index2].fit:
-                newPop.append(copy.deepcopy(self[index1]))
-            elif self[index1].fit < self[index2].fit:
-                newPop.append(copy.deepcopy(self[index2]))
-            else:
-                rn=self.uniprng.random()
-                if rn > 0.5:
-                    newPop.append(copy.deepcopy(self[index1]))
-                else:
-                    newPop.append(copy.deepcopy(self[index2]))
-        
-        # overwrite old pop with newPop    
-        self.population=newPop        
+        # k-way tournament (binary by default)
+        key=np.fromiter((individual.fit for individual in self.population),dtype=float,count=len(self))
+        winners=tournamentSelect(key,self.rng,self.tournamentSize)
+
+        # overwrite old pop with the winners: first occurrences are reused (the
+        # offspring population is a private copy), repeated winners are cloned
+        first=np.zeros(len(winners),dtype=bool)
+        first[np.unique(winners,return_index=True)[1]]=True
+        self.population=[self.population[i] if f else self.population[i].clone() for i,f in zip(winners.tolist(),first.tolist())]
 
 
     def combinePops(self,otherPop):
         self.population.extend(otherPop.population)
 
     def truncateSelect(self,newPopSize):
+        if self.truncationMethod == 'partial':
+            #keep the top newPopSize without sorting
+            fit=np.fromiter((individual.fit for individual in self.population),dtype=float,count=len(self))
+            self.population=[self.population[i] for i in topIndices(fit,newPopSize).tolist()]
+            return
+
         #sort by fitness
         self.population.sort(key=attrgetter('fit'),reverse=True)
         
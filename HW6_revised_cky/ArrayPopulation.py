@@ -0,0 +1,222 @@
+#
+# ArrayPopulation.py
+#
+#
+
+import numpy as np
+from Population import *
+
+
+#Lightweight read-only view of one row of an ArrayPopulation,
+# so printStats and friends can treat it like an Individual
+#
+class ArrayIndividual:
+    """
+    ArrayIndividual
+    """
+    __slots__=('pop','index')
+
+    def __init__(self, pop, index):
+        self.pop=pop
+        self.index=index
+
+    @property
+    def state(self):
+        return self.pop.state[self.index].tolist()
+
+    @property
+    def fit(self):
+        return self.pop.fit[self.index].item()
+
+    @property
+    def mutRate(self):
+        return self.pop.mutRate[self.index].item()
+
+    @property
+    def penalty(self):
+        return self.pop.penalty[self.index].item()
+
+    def __str__(self):
+        s=str(self.state)+'\t'+'%0.8e'%self.fit+'\t'+'%0.8e'%self.mutRate
+        if self.pop.mode == 1 and self.pop.isInteger(): s+='\t'+str(self.penalty)
+        return s
+
+
+#Population backend keeping every genome in one (populationSize, nLength)
+# matrix plus parallel fit/mutRate/penalty vectors.  Fitness is NaN when
+# an individual needs (re-)evaluation, the array analogue of fit=None.
+#
+class ArrayPopulation(Population):
+    """
+    ArrayPopulation
+    """
+    def __init__(self, populationSize):
+        """
+        ArrayPopulation constructor
+        """
+        indType=self.individualType
+        if self.isInteger():
+            self.state=self.rng.integers(0,indType.nItems,size=(populationSize,indType.nLength))
+        else:
+            self.state=self.rng.uniform(indType.minLimit,indType.maxLimit,size=(populationSize,indType.nLength))
+        self.mutRate=self.rng.uniform(0.1,0.9,size=populationSize)
+        self.fit=np.full(populationSize,np.nan)
+        self.penalty=np.zeros(populationSize,dtype=np.int64)
+
+        if self.isInteger():
+            if self.mode == 1: self.compute_penalty()
+            if self.mode == 2: self.repair(np.arange(populationSize))
+
+        self.evaluateFitness()
+
+    @classmethod
+    def isInteger(cls):
+        return issubclass(cls.individualType,IntVectorIndividual)
+
+    def __len__(self):
+        return self.state.shape[0]
+
+    def __getitem__(self,key):
+        if key < 0: key+=len(self)
+        if key < 0 or key >= len(self): raise IndexError('population index out of range')
+        return ArrayIndividual(self,key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield ArrayIndividual(self,i)
+
+    def __setitem__(self,key,newValue):
+        self.state[key]=newValue.state
+        self.fit[key]=np.nan if newValue.fit is None else newValue.fit
+        self.mutRate[key]=newValue.mutRate
+        self.penalty[key]=getattr(newValue,'penalty',0) or 0
+
+    def _take(self,index):
+        #gather rows in one fancy-indexing pass (this copies the genomes)
+        self.state=self.state[index]
+        self.fit=self.fit[index]
+        self.mutRate=self.mutRate[index]
+        self.penalty=self.penalty[index]
+
+    def copy(self):
+        other=self.__class__.__new__(self.__class__)
+        other.state=self.state.copy()
+        other.fit=self.fit.copy()
+        other.mutRate=self.mutRate.copy()
+        other.penalty=self.penalty.copy()
+        return other
+
+    def toArrays(self):
+        return {'state': self.state.copy(),'fit': self.fit.copy(),'mutRate': self.mutRate.copy(),'penalty': self.penalty.copy()}
+
+    @classmethod
+    def fromArrays(cls,data):
+        population=cls.__new__(cls)
+        population.state=data['state'].copy()
+        population.fit=data['fit'].astype(float)
+        population.mutRate=data['mutRate'].copy()
+        population.penalty=data['penalty'].copy()
+        return population
+
+    def evaluateFitness(self):
+        pending=np.flatnonzero(np.isnan(self.fit))
+        if len(pending) == 0: return
+        states=self.state[pending]
+        if self.fitnessCache is not None:
+            self.fit[pending]=self.fitnessCache.evaluate(states,self.scoreStates)
+        else:
+            self.fit[pending]=self.scoreStates(states)
+
+    def mutate(self):
+        indType=self.individualType
+        n=len(self)
+
+        if self.isInteger():
+            #self-adaptive mutation rate update
+            self.mutRate*=np.exp(indType.learningRate*self.rng.standard_normal(n))
+            np.clip(self.mutRate,indType.minMutRate,indType.maxMutRate,out=self.mutRate)
+
+            before=self.state.copy()
+            mask=self.rng.random(self.state.shape) < self.mutRate[:,None]
+            self.state[mask]=self.rng.integers(0,indType.nItems,size=np.count_nonzero(mask))
+            if self.mode == 2: self.repair(np.arange(n))
+
+            #only rows whose genome actually changed need re-evaluation
+            self.fit[(self.state != before).any(axis=1)]=np.nan
+        else:
+            indType.mutateArrays(self.state,self.mutRate,self.rng)
+            self.fit[:]=np.nan
+
+    def crossover(self):
+        for index1,index2 in crossoverPairs(len(self),self.crossoverFraction,self.rng):
+            rows=np.concatenate((index1,index2))
+            before=self.state[rows]
+            self.individualType.crossoverArrays(self.state,index1,index2,self.rng)
+            if self.isInteger() and self.mode == 2: self.repair(rows)
+
+            #only rows whose genome actually changed need re-evaluation
+            self.fit[rows[(self.state[rows] != before).any(axis=1)]]=np.nan
+
+    def conductTournament(self):
+        # k-way tournament (binary by default), on penalty for constrained tournaments
+        key=self.penalty if self.mode == 1 else self.fit
+        self._take(tournamentSelect(key,self.rng,self.tournamentSize))
+
+    def combinePops(self,otherPop):
+        self.state=np.concatenate((self.state,otherPop.state))
+        self.fit=np.concatenate((self.fit,otherPop.fit))
+        self.mutRate=np.concatenate((self.mutRate,otherPop.mutRate))
+        self.penalty=np.concatenate((self.penalty,otherPop.penalty))
+
+    def truncateSelect(self,newPopSize):
+        if self.truncationMethod == 'partial':
+            #keep the top newPopSize without sorting, penalty first for constrained mode
+            self._take(topIndices(self.fit,newPopSize,self.penalty if self.mode == 1 else None))
+            return
+
+        if self.mode == 1:
+            #drop infeasible individuals, then sort the rest by fitness
+            index=np.flatnonzero(self.penalty == 0)
+            index=index[np.argsort(-self.fit[index],kind='stable')]
+        else:
+            #sort by fitness
+            index=np.argsort(-self.fit,kind='stable')
+
+        #then truncate the bottom
+        self._take(index[:newPopSize])
+
+    def compute_penalty(self):
+        #minus one for every item type missing from a row
+        counts=itemCounts(self.state,self.individualType.nItems)
+        self.penalty=-np.count_nonzero(counts == 0,axis=1)
+
+    def repair(self,rows):
+        #put each missing item type on a random surplus site of its row (one random
+        # site of every item present is kept), for all rows at once
+        rows=np.asarray(rows)
+        counts=itemCounts(self.state[rows],self.individualType.nItems)
+        numMissing=np.count_nonzero(counts == 0,axis=1)
+        need=np.flatnonzero(numMissing)
+        if len(need) == 0: return
+        rows=rows[need]
+        counts=counts[need]
+        numMissing=numMissing[need]
+        states=self.state[rows]
+
+        #sites grouped by item in random order, all but the first of a group are surplus
+        order=np.argsort(states+self.rng.random(states.shape),axis=1)
+        grouped=np.take_along_axis(states,order,axis=1)
+        surplus=np.zeros(states.shape,dtype=bool)
+        surplus[:,1:]=grouped[:,1:] == grouped[:,:-1]
+
+        #random order over the surplus sites, other sites last
+        keys=np.where(surplus,self.rng.random(states.shape),2.0)
+        width=min(numMissing.max(),states.shape[1])
+        sites=np.take_along_axis(order,np.argsort(keys,axis=1)[:,:width],axis=1)
+
+        #missing item types in ascending order
+        items=np.argsort(counts != 0,axis=1,kind='stable')[:,:width]
+
+        valid=np.arange(width)[None,:] < np.minimum(numMissing,np.count_nonzero(surplus,axis=1))[:,None]
+        rowIndex=np.broadcast_to(rows[:,None],sites.shape)
+        self.state[rowIndex[valid],sites[valid]]=items[valid]
@@ -0,0 +1,123 @@
+#
+# AsyncEvaluator.py
+#
+#
+
+import os
+import sys
+import json
+import asyncio
+import subprocess
+
+
+#Client for an evaluator speaking the EvaluatorServer protocol: one JSON
+# state per line, one JSON fitness per line back
+#
+class SocketEvaluator:
+    """
+    SocketEvaluator
+    """
+    def __init__(self, address):
+        """
+        SocketEvaluator constructor, address is 'host:port'
+        """
+        host,port=address.rsplit(':',1)
+        self.host=host
+        self.port=int(port)
+
+    async def __call__(self,state):
+        reader,writer=await asyncio.open_connection(self.host,self.port)
+        try:
+            writer.write((json.dumps(state)+'\n').encode())
+            await writer.drain()
+            line=await reader.readline()
+            if not line: raise ConnectionError('evaluator closed the connection without an answer')
+            return json.loads(line)
+        finally:
+            writer.close()
+
+
+#Evaluation stage for slow external evaluators: all states of a batch are
+# submitted concurrently to an evaluator coroutine, at most maxConcurrency
+# at a time, each attempt bounded by timeout seconds and retried up to
+# retries times (with exponential backoff) before the batch fails.
+#
+class AsyncEvaluator:
+    """
+    AsyncEvaluator
+    """
+    retryErrors=(asyncio.TimeoutError,OSError,ValueError)
+
+    def __init__(self, evaluate, maxConcurrency=32, timeout=None, retries=0, backoff=0.05):
+        """
+        AsyncEvaluator constructor
+          evaluate: coroutine function state -> fitness
+          timeout: seconds per attempt (None: no limit)
+        """
+        if maxConcurrency < 1: raise Exception('Invalid evaluation concurrency: ' + str(maxConcurrency))
+        self.evaluate=evaluate
+        self.maxConcurrency=maxConcurrency
+        self.timeout=timeout
+        self.retries=retries
+        self.backoff=backoff
+        self.numRetries=0
+        self.reportedRetries=0
+        self.loop=asyncio.new_event_loop()
+
+    async def evaluateOne(self,state,limit):
+        async with limit:
+            for attempt in range(self.retries+1):
+                try:
+                    return await asyncio.wait_for(self.evaluate(state),self.timeout)
+                except self.retryErrors as info:
+                    if attempt == self.retries:
+                        raise Exception('Evaluation failed after {} attempt(s): {!r}'.format(attempt+1,info))
+                    self.numRetries+=1
+                    await asyncio.sleep(self.backoff*2**attempt)
+
+    async def run(self,states,onResult=None):
+        limit=asyncio.Semaphore(self.maxConcurrency)
+        fits=[None]*len(states)
+
+        async def evaluateAt(k):
+            fits[k]=await self.evaluateOne(states[k],limit)
+            if onResult is not None: onResult(k,fits[k])
+
+        tasks=[asyncio.ensure_future(evaluateAt(k)) for k in range(len(states))]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            #on failure, do not leave the other evaluations running
+            for task in tasks: task.cancel()
+            await asyncio.gather(*tasks,return_exceptions=True)
+        return fits
+
+    def evaluateStates(self,states,onResult=None):
+        """
+        Fitness list for a list of states, onResult(index, fit) is called as results arrive
+        """
+        if len(states) == 0: return []
+        return self.loop.run_until_complete(self.run(states,onResult))
+
+    def counts(self):
+        #retries since the previous call, as an extra per-generation stats field
+        rec={'evaluationRetries': self.numRetries-self.reportedRetries}
+        self.reportedRetries=self.numRetries
+        return rec
+
+    def close(self):
+        self.loop.close()
+
+
+def startLocalServer(setup,delay=0.0,failRate=0.0):
+    """
+    Start EvaluatorServer.py in a subprocess on a free localhost port, returns (process, address)
+    """
+    script=os.path.join(os.path.dirname(os.path.abspath(__file__)),'EvaluatorServer.py')
+    args=[sys.executable,script,'--setup',json.dumps(setup),'--delay',str(delay),'--failRate',str(failRate)]
+    server=subprocess.Popen(args,stdout=subprocess.PIPE,text=True)
+    line=server.stdout.readline().split()
+    if len(line) != 2 or line[0] != 'port':
+        server.kill()
+        raise Exception('Local evaluator server failed to start')
+    return server,'127.0.0.1:'+line[1]
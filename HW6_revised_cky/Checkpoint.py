@@ -0,0 +1,78 @@
+#
+# Checkpoint.py
+#
+#
+
+import os
+import json
+import math
+import numpy as np
+from Population import *
+
+
+#Engine checkpoints are plain NumPy .npz archives (no pickled objects):
+#  - population arrays: state (integer states in the smallest dtype), fit,
+#    mutRate (and penalty for integer states)
+#  - generation counter and a few config items checked on resume
+#  - random.Random states as uint32 arrays, NumPy Generator states as JSON
+# Files are written uncompressed to a temporary name and renamed into place,
+# so a crash while writing never destroys the previous checkpoint.
+#
+
+def randomArrays(name,prng):
+    version,internal,gaussNext=prng.getstate()
+    return {name+'Version': np.array(version),
+            name+'State': np.array(internal,dtype=np.uint32),
+            name+'Gauss': np.array(np.nan if gaussNext is None else gaussNext)}
+
+def setRandomArrays(name,prng,data):
+    gaussNext=data[name+'Gauss'].item()
+    prng.setstate((data[name+'Version'].item(),tuple(data[name+'State'].tolist()),None if math.isnan(gaussNext) else gaussNext))
+
+def generatorStates():
+    #NumPy Generators used by the population-level operators
+    states={'rng': Population.rng,'normrng': MultivariateIndividual.normrng}
+    return dict((name,rng.bit_generator.state) for name,rng in states.items() if rng is not None)
+
+def setGeneratorStates(states):
+    if 'rng' in states: Population.rng.bit_generator.state=states['rng']
+    if 'normrng' in states: MultivariateIndividual.normrng.bit_generator.state=states['normrng']
+
+
+def saveCheckpoint(fileName,population,generation,uniprng,normprng,cfg):
+    """
+    Write the full engine state after the given generation
+    """
+    data=population.toArrays()
+    if np.issubdtype(data['state'].dtype,np.integer) and data['state'].size > 0:
+        #item types fit in a byte or two
+        data['state']=data['state'].astype(np.min_scalar_type(int(data['state'].max())))
+    data['generation']=np.array(generation)
+    data['evaluator']=np.array(cfg.evaluator)
+    data['populationType']=np.array(cfg.populationType or 'object')
+    data['generators']=np.array(json.dumps(generatorStates()))
+    data.update(randomArrays('uniprng',uniprng))
+    data.update(randomArrays('normprng',normprng))
+
+    tmpFileName=fileName+'.tmp'
+    with open(tmpFileName,'wb') as outfile:
+        np.savez(outfile,**data)
+    os.replace(tmpFileName,fileName)
+
+
+def loadCheckpoint(fileName,popType,uniprng,normprng,cfg):
+    """
+    Restore the engine state, returns (population, generation)
+    """
+    with np.load(fileName,allow_pickle=False) as data:
+        data=dict(data)
+    if np.issubdtype(data['state'].dtype,np.integer): data['state']=data['state'].astype(np.int64)
+
+    if data['evaluator'].item() != cfg.evaluator or data['populationType'].item() != (cfg.populationType or 'object'):
+        raise Exception('Checkpoint {} does not match the evaluator/populationType of the config'.format(fileName))
+
+    population=popType.fromArrays(data)
+    setRandomArrays('uniprng',uniprng,data)
+    setRandomArrays('normprng',normprng,data)
+    setGeneratorStates(json.loads(data['generators'].item()))
+    return population,data['generation'].item()
@@ -1,11 +1,13 @@
 
 import math
+import numpy as np
 
 #1-D lattice total energy function evaluator class
 #
 class Particles1D:
     selfEnergy=None
     interactionEnergy=None
+    deterministic=True      #same state, same fitness (results may be cached)
         
     @classmethod  
     def fitnessFunc(cls,state):
@@ -20,12 +22,51 @@ class Particles1D:
             
         return -totalEnergy
 
+    @classmethod
+    def deltaFitnessFunc(cls,state,changes,fit):
+        #fitness of state from the fit it had before the recorded site changes
+        # ({position: oldValue}); only touched self/interaction terms are re-summed
+        last=len(state)-1
+        deltaEnergy=0
+        pairs=set()
+        for i,old in changes.items():
+            deltaEnergy+=cls.selfEnergy[state[i]]-cls.selfEnergy[old]
+            if i > 0: pairs.add(i-1)
+            if i < last: pairs.add(i)
+        for i in pairs:
+            oldLeft=changes.get(i,state[i])
+            oldRight=changes.get(i+1,state[i+1])
+            #each neighbour pair is counted once from either side
+            deltaEnergy+=2*(cls.interactionEnergy[state[i]][state[i+1]]-cls.interactionEnergy[oldLeft][oldRight])
+        return fit-deltaEnergy
+
+    @classmethod
+    def energyTables(cls):
+        #NumPy copies of selfEnergy/interactionEnergy, rebuilt if the class attributes are reassigned
+        key=(id(cls.selfEnergy),id(cls.interactionEnergy))
+        if getattr(cls,'_tableKey',None) != key:
+            cls._selfTable=np.asarray(cls.selfEnergy)
+            cls._interactionTable=np.asarray(cls.interactionEnergy)
+            cls._tableKey=key
+        return cls._selfTable,cls._interactionTable
+
+    @classmethod
+    def batchFitnessFunc(cls,states):
+        #states: 2-D (numStates, latticeLength) integer array, returns a fitness vector
+        states=np.asarray(states)
+        selfTable,interactionTable=cls.energyTables()
+        totalEnergy=selfTable[states].sum(axis=1)
+        #each neighbour pair is counted once from either side
+        totalEnergy+=2*interactionTable[states[:,:-1],states[:,1:]].sum(axis=1)
+        return -totalEnergy
+
 
 #Multi-dimensional Rastrigin function evaluator class
 #
 class Rastrigin:
     nVars=None
     A=None
+    deterministic=True
         
     @classmethod  
     def fitnessFunc(cls,state):
@@ -35,3 +76,10 @@ class Rastrigin:
             fitness+=state[i]*state[i] - cls.A*math.cos(2.0*math.pi*state[i])
             
         return -fitness
+
+    @classmethod
+    def batchFitnessFunc(cls,states):
+        #states: 2-D (numStates, nVars) real array, returns a fitness vector
+        x=np.asarray(states,dtype=float)[:,:cls.nVars]
+        fitness=cls.A*cls.nVars+(x*x-cls.A*np.cos(2.0*np.pi*x)).sum(axis=1)
+        return -fitness
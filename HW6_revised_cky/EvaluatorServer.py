@@ -0,0 +1,85 @@
+#
+# EvaluatorServer.py: local stand-in for a slow external fitness evaluator
+#
+#
+# To run: python EvaluatorServer.py --setup '{"evaluator": "particles1d", "selfEnergy": [1,2,3], "interactionEnergy": [[10,4,1],[4,10,5],[1,5,10]]}' --delay 0.05
+#
+# Serves the ev3a evaluators (Particles1D, Rastrigin) over a localhost TCP
+# socket, one JSON state per line in, one JSON fitness per line out.  The
+# chosen port is printed as the first stdout line ("port N").  --delay
+# simulates a slow simulation, --failRate drops a fraction of the requests
+# without an answer so timeouts and retries can be exercised offline.
+#
+
+import optparse
+import sys
+import json
+import asyncio
+from random import Random
+from Evaluator import *
+
+
+def setupEvaluator(setup):
+    #configure the evaluator class from the setup dict, returns its fitness function
+    if setup['evaluator'] == 'particles1d':
+        Particles1D.selfEnergy=setup['selfEnergy']
+        Particles1D.interactionEnergy=setup['interactionEnergy']
+        return Particles1D.fitnessFunc
+    elif setup['evaluator'] == 'rastrigin':
+        Rastrigin.A=setup['rastriginA']
+        Rastrigin.nVars=setup['rastriginN']
+        return Rastrigin.fitnessFunc
+    else:
+        raise Exception('Unknown evaluator type: ' + str(setup['evaluator']))
+
+
+async def serve(fitFunc,host,port,delay,failRate,seed):
+    failprng=Random(seed)
+
+    async def handle(reader,writer):
+        try:
+            while True:
+                line=await reader.readline()
+                if not line: break
+                state=json.loads(line)
+                if delay > 0: await asyncio.sleep(delay)
+                if failprng.random() < failRate: break   #simulated failure: hang up without answering
+                writer.write((json.dumps(fitFunc(state))+'\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server=await asyncio.start_server(handle,host,port)
+    print('port',server.sockets[0].getsockname()[1],flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+#
+# Main entry point
+#
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+
+    parser = optparse.OptionParser()
+    parser.add_option("-s", "--setup", action="store", dest="setup", help="JSON evaluator setup (evaluator name and its parameters)", default=None)
+    parser.add_option("-H", "--host", action="store", dest="host", help="interface to listen on", default='127.0.0.1')
+    parser.add_option("-p", "--port", action="store", type="int", dest="port", help="port (0: pick a free one)", default=0)
+    parser.add_option("-t", "--delay", action="store", type="float", dest="delay", help="simulated evaluation time in seconds", default=0.0)
+    parser.add_option("-f", "--failRate", action="store", type="float", dest="failRate", help="fraction of requests dropped without an answer", default=0.0)
+    parser.add_option("-r", "--seed", action="store", type="int", dest="seed", help="random seed for the simulated failures", default=0)
+    (options, args) = parser.parse_args(argv)
+
+    if options.setup is None: raise Exception('Must specify the evaluator setup using -s or --setup option.')
+    fitFunc=setupEvaluator(json.loads(options.setup))
+    try:
+        asyncio.run(serve(fitFunc,options.host,options.port,options.delay,options.failRate,options.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#
+# FitnessCache.py
+#
+#
+
+import numpy as np
+from collections import OrderedDict
+
+
+#Bounded LRU memo of fitness values for deterministic evaluators.  Genomes
+# are keyed by the raw bytes of their row in a compact array (e.g. uint8
+# for a few particle types), so looking up a whole batch costs one
+# conversion plus one dict probe per genome.
+#
+class FitnessCache:
+    """
+    FitnessCache
+    """
+    def __init__(self, maxSize, dtype=None):
+        """
+        FitnessCache constructor
+          maxSize: maximum number of cached genomes, least recently used ones are evicted
+          dtype: compact element type used for the keys (None: keep the state dtype)
+        """
+        if maxSize < 1: raise Exception('Invalid fitness cache size: ' + str(maxSize))
+        self.maxSize=maxSize
+        self.dtype=dtype
+        self.table=OrderedDict()
+        self.hits=0
+        self.misses=0
+        self.reportedHits=0
+        self.reportedMisses=0
+
+    def __len__(self):
+        return len(self.table)
+
+    def keys(self,states):
+        #one bytes key per row of a 2-D state array
+        states=np.ascontiguousarray(states,dtype=self.dtype)
+        return states.view(np.dtype((np.void,states.dtype.itemsize*states.shape[1]))).ravel().tolist()
+
+    def evaluate(self,states,scoreFunc):
+        """
+        Fitness list for a 2-D state array, scoreFunc(states) is only called on the misses
+        """
+        keys=self.keys(states)
+        fits=[]
+        miss=[]
+        for k,key in enumerate(keys):
+            fit=self.table.get(key)
+            if fit is None:
+                miss.append(k)
+            else:
+                self.table.move_to_end(key)
+            fits.append(fit)
+        self.hits+=len(keys)-len(miss)
+        self.misses+=len(miss)
+        if len(miss) == 0: return fits
+
+        for k,fit in zip(miss,scoreFunc(states[miss])):
+            fits[k]=fit
+            self.table[keys[k]]=fit
+        while len(self.table) > self.maxSize: self.table.popitem(last=False)
+        return fits
+
+    def counts(self):
+        #hits/misses since the previous call, as extra per-generation stats fields
+        rec={'cacheHits': self.hits-self.reportedHits,'cacheMisses': self.misses-self.reportedMisses,'cacheSize': len(self.table)}
+        self.reportedHits=self.hits
+        self.reportedMisses=self.misses
+        return rec
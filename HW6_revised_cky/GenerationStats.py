@@ -0,0 +1,101 @@
+#
+# GenerationStats.py
+#
+#
+
+import sys
+import json
+import math
+import numpy as np
+
+
+#Per-generation statistics computed in one vectorized pass and streamed as
+# compact CSV or JSON-lines records to a buffered file and/or a callback.
+# The full population is only dumped every dumpInterval generations.
+#
+class GenerationStats:
+    """
+    GenerationStats
+    """
+    def __init__(self, fileName=None, format='csv', callback=None, dumpInterval=0, rateName='mutRate', mode=None, dumpFile=None, append=False, counters=None):
+        """
+        GenerationStats constructor
+          counters: optional function returning extra fields for each record (e.g. fitness cache hits/misses)
+          append: continue an existing stats file (e.g. a resumed run) instead of overwriting it
+          rateName: per-individual step-size attribute reported for the best individual (None: skip)
+          mode: constraint-handling mode, mode 1 adds the count of infeasible individuals
+        """
+        if format not in ('csv','jsonl'): raise Exception('Unknown stats format: ' + str(format))
+        self.format=format
+        self.callback=callback
+        self.dumpInterval=dumpInterval or 0
+        self.rateName=rateName
+        self.mode=mode
+        self.dumpFile=dumpFile if dumpFile is not None else sys.stdout
+        self.counters=counters
+        self.outFile=None if fileName is None else open(fileName,'a' if append else 'w',buffering=1<<16)
+        self.wroteHeader=append
+
+    def summarize(self,pop,gen):
+        """
+        Compute the record for one generation
+        """
+        rec={'generation': gen}
+
+        if hasattr(pop,'best') and hasattr(pop,'avg'):
+            #steady-state container already tracks these incrementally
+            best=pop.best()
+            rec['best']=best.fit
+            rec['mean']=pop.avg()
+            rec['std']=pop.std()
+            if self.rateName is not None: rec[self.rateName]=getattr(best,self.rateName)
+            return rec
+
+        fit=getattr(pop,'fit',None)
+        if isinstance(fit,np.ndarray):
+            #array-backed population: use its vectors directly
+            rate=getattr(pop,self.rateName) if self.rateName is not None else None
+            penalty=getattr(pop,'penalty',None)
+        else:
+            n=len(pop)
+            fit=np.fromiter((ind.fit for ind in pop),dtype=float,count=n)
+            rate=np.fromiter((getattr(ind,self.rateName) for ind in pop),dtype=float,count=n) if self.rateName is not None else None
+            penalty=np.fromiter((ind.penalty for ind in pop),dtype=float,count=n) if self.mode == 1 else None
+
+        ibest=int(np.argmax(fit))
+        rec['best']=fit[ibest].item()
+        rec['mean']=fit.mean().item()
+        rec['std']=fit.std(ddof=1).item() if len(fit) > 1 else math.nan
+        if rate is not None: rec[self.rateName]=rate[ibest].item()
+        if self.mode == 1 and penalty is not None: rec['infeasible']=int(np.count_nonzero(penalty))
+        return rec
+
+    def record(self,pop,gen):
+        """
+        Summarize one generation, stream the record, and dump the population if due
+        """
+        rec=self.summarize(pop,gen)
+        if self.counters is not None: rec.update(self.counters())
+        if self.outFile is not None: self.write(rec)
+        if self.callback is not None: self.callback(rec)
+        if self.dumpInterval > 0 and gen % self.dumpInterval == 0: self.dump(pop,gen)
+        return rec
+
+    def write(self,rec):
+        if self.format == 'jsonl':
+            self.outFile.write(json.dumps(rec)+'\n')
+        else:
+            if not self.wroteHeader:
+                self.outFile.write(','.join(rec.keys())+'\n')
+                self.wroteHeader=True
+            self.outFile.write(','.join(str(value) for value in rec.values())+'\n')
+
+    def dump(self,pop,gen):
+        lines=['Generation: '+str(gen)]
+        lines.extend(str(ind) for ind in pop)
+        self.dumpFile.write('\n'.join(lines)+'\n\n')
+
+    def close(self):
+        if self.outFile is not None:
+            self.outFile.close()
+            self.outFile=None
@@ -4,6 +4,7 @@
 #
 
 import math
+import numpy as np
 
 #Base class for all individual types
 #
@@ -17,9 +18,12 @@ class Individual:
     uniprng=None
     normprng=None
     fitFunc=None
+    batchFitFunc=None
+    deltaFitFunc=None
 
-    def __init__(self):
-        self.fit=self.__class__.fitFunc(self.state)
+    def __init__(self, evaluate=True):
+        #evaluate=False leaves fit=None for a later (e.g. external) evaluation
+        self.fit=self.__class__.fitFunc(self.state) if evaluate else None
         self.mutRate=self.uniprng.uniform(0.9,0.1) #use "normalized" sigma
             
     def mutateMutRate(self):
@@ -29,6 +33,34 @@ class Individual:
             
     def evaluateFitness(self):
         if self.fit == None: self.fit=self.__class__.fitFunc(self.state)
+
+    def updateFitness(self):
+        #incremental re-evaluation hook, returns True if fit was updated
+        return False
+
+    def clone(self):
+        #cheap copy of the per-individual data only (no deepcopy, no ctor/evaluation)
+        other=self.__class__.__new__(self.__class__)
+        other.state=list(self.state)
+        other.fit=self.fit
+        other.mutRate=self.mutRate
+        return other
+
+    @classmethod
+    def fromData(cls,state,fit,mutRate,penalty=None):
+        #rebuild an individual from saved data (no ctor/evaluation)
+        individual=cls.__new__(cls)
+        individual.state=state
+        individual.fit=fit
+        individual.mutRate=mutRate
+        return individual
+
+    def setState(self, state):
+        #overwrite the state with a row produced by a batch operator
+        state=np.asarray(state).tolist()
+        if state != self.state:
+            self.state=state
+            self.fit=None
     
     
 
@@ -43,9 +75,13 @@ class IntVectorIndividual(Individual):
     nLength=None
     nItems=None
     mode = None
+    maxDeltaFraction=0.25   #above this fraction of changed sites, re-evaluate from scratch
         
-    def __init__(self):
+    def __init__(self, evaluate=True):
         self.state=[]
+        self.fit=None           #evaluated by the base class ctor
+        self.changes={}         #{position: value at last evaluation} for incremental fitness
+        self.baseFit=None       #fit of the state before the recorded changes
         self.penalty = -self.nItems
         ### Initialization sould fit the 4th requirement.
         for i in range(self.nLength):
@@ -59,36 +95,104 @@ class IntVectorIndividual(Individual):
             self.repair()       ### repair the states
         
         
-        super().__init__() #call base class ctor
+        super().__init__(evaluate) #call base class ctor
+        
+    def markDirty(self):
+        #start recording changes against the current fit (if it is known)
+        if self.fit is not None:
+            self.baseFit=self.fit
+            self.changes={}
+        self.fit=None
+
+    def setGene(self, i, value):
+        #change one lattice site, remembering its value at the last evaluation
+        if value == self.state[i]: return
+        if i not in self.changes: self.changes[i]=self.state[i]
+        self.state[i]=value
+
+    def keepFitIfUnchanged(self):
+        #no site differs from the last evaluation (nothing changed, or changed back): fit still holds
+        if self.fit is None and self.baseFit is not None and all(self.state[i] == value for i,value in self.changes.items()):
+            self.fit=self.baseFit
+            self.changes={}
+
+    def setState(self, state):
+        #overwrite the state with a row produced by a batch operator,
+        # recording only the sites that actually changed
+        self.markDirty()
+        values=np.asarray(state).tolist()
+        for i in np.flatnonzero(np.asarray(state) != np.array(self.state)).tolist():
+            self.setGene(i,values[i])
+        self.keepFitIfUnchanged()
+
+    def updateFitness(self):
+        if self.deltaFitFunc is None or self.baseFit is None: return False
+        if len(self.changes) > self.maxDeltaFraction*self.nLength: return False
+        self.fit=self.__class__.deltaFitFunc(self.state,self.changes,self.baseFit)
+        return True
+
+    def evaluateFitness(self):
+        if self.fit == None:
+            if not self.updateFitness(): self.fit=self.__class__.fitFunc(self.state)
         
     def crossover(self, other):
+        self.markDirty()
+        other.markDirty()
+
         #perform crossover "in-place"
         for i in range(self.nLength):
             if self.uniprng.random() < 0.5:
                 tmp=self.state[i]
-                self.state[i]=other.state[i]
-                other.state[i]=tmp
+                self.setGene(i,other.state[i])
+                other.setGene(i,tmp)
 
         if(self.mode == 2):
             self.repair()       ### repair the states
-                        
-        self.fit=None
-        other.fit=None
+
+        #swapping equal genes changes nothing
+        self.keepFitIfUnchanged()
+        other.keepFitIfUnchanged()
+
+    @classmethod
+    def crossoverArrays(cls,states,index1,index2,rng):
+        #uniform crossover of the mating pairs (index1[k], index2[k]) of a
+        # (populationSize, nLength) state matrix, in-place, with one swap mask
+        a=states[index1]
+        b=states[index2]
+        swap=rng.random(a.shape) < 0.5
+        states[index1]=np.where(swap,b,a)
+        states[index2]=np.where(swap,a,b)
     
     def mutate(self):
+        self.markDirty()
         self.mutateMutRate()    #update mutation rate
         
         for i in range(self.nLength):
             if self.uniprng.random() < self.mutRate:
-                self.state[i]=self.uniprng.randint(0,self.nItems-1)
+                self.setGene(i,self.uniprng.randint(0,self.nItems-1))
 
         if(self.mode == 1):
             self.penalty=None
 
         if(self.mode == 2):
             self.repair()       ### repair the states
-        
-        self.fit=None
+
+        self.keepFitIfUnchanged()
+
+    @classmethod
+    def fromData(cls,state,fit,mutRate,penalty=None):
+        individual=super().fromData(state,fit,mutRate)
+        individual.penalty=penalty
+        individual.changes={}
+        individual.baseFit=None
+        return individual
+
+    def clone(self):
+        other=super().clone()
+        other.penalty=self.penalty
+        other.changes=dict(self.changes)
+        other.baseFit=self.baseFit
+        return other
             
     def __str__(self):
         if self.mode ==1:
@@ -96,32 +200,32 @@ class IntVectorIndividual(Individual):
         else:
             return str(self.state)+'\t'+'%0.8e'%self.fit+'\t'+'%0.8e'%self.mutRate
     
+    def itemCounts(self):
+        #occurrences of every item type, one pass over the state
+        counts=[0]*self.nItems
+        for j in self.state: counts[j]+=1
+        return counts
+
     def panelty_value(self):
-        nItems_counts=0
-        nList = list(range(0,self.nItems))
-        penalty_value = -self.nItems
-        
-        for j in self.state:
-            if j in nList:
-                nItems_counts +=1
-                nList.remove(j)
-                penalty_value +=1
-        self.penalty = penalty_value
+        #minus one for every item type missing from the state
+        self.penalty = -self.itemCounts().count(0)
 
     def repair(self):
-        nItems_counts=0
-        nList = list(range(0,self.nItems))
-        for j in self.state:
-            if j in nList:
-                nItems_counts +=1
-                nList.remove(j)
-        maxItem = max(self.state,key=self.state.count)
-        while (nItems_counts!= self.nItems):
-            index_list = [k for k,item in enumerate(self.state) if item==maxItem]
-            index = self.uniprng.sample(index_list,1)
-            self.state[index[0]] = nList[0]
-            nList.pop(0)
-            nItems_counts += 1
+        #put each missing item type on a random surplus site: one random site of
+        # every item present is kept, any other site can be overwritten
+        counts=self.itemCounts()
+        nList = [item for item in range(self.nItems) if counts[item] == 0]
+        if len(nList) == 0: return
+        self.markDirty()
+        order=list(range(len(self.state)))
+        self.uniprng.shuffle(order)
+        kept=set()
+        index_list=[]
+        for k in order:
+            if self.state[k] in kept: index_list.append(k)
+            else: kept.add(self.state[k])
+        for item,index in zip(nList,index_list):
+            self.setGene(index,item)
     
     
 #Multivariate real representation class
@@ -133,17 +237,20 @@ class MultivariateIndividual(Individual):
     nLength=None
     minLimit=None
     maxLimit=None
+    normrng=None    #NumPy Generator for population-level (batch) mutation
 
-    def __init__(self):
+    def __init__(self, evaluate=True):
         self.state=[]
         for i in range(self.nLength):
             self.state.append(self.uniprng.uniform(self.minLimit,self.maxLimit))
          
-        super().__init__() #call base class ctor
+        super().__init__(evaluate) #call base class ctor
         
     def crossover(self, other):
         #perform crossover "in-place"
         alpha=self.uniprng.random()
+        selfState=list(self.state)
+        otherState=list(other.state)
         
         for i in range(self.nLength):
             tmp=self.state[i]*alpha+other.state[i]*(1-alpha)
@@ -155,8 +262,19 @@ class MultivariateIndividual(Individual):
             if other.state[i] > self.maxLimit: other.state[i]=self.maxLimit
             if other.state[i] < self.minLimit: other.state[i]=self.minLimit
         
-        self.fit=None
-        other.fit=None
+        #only re-evaluate genomes that actually changed (e.g. not identical parents)
+        if self.state != selfState: self.fit=None
+        if other.state != otherState: other.fit=None
+
+    @classmethod
+    def crossoverArrays(cls,states,index1,index2,rng):
+        #arithmetic crossover of the mating pairs (index1[k], index2[k]) of a
+        # (populationSize, nLength) state matrix, in-place, one alpha per pair
+        a=states[index1]
+        b=states[index2]
+        alpha=rng.random(len(index1))[:,None]
+        states[index1]=np.clip(a*alpha+b*(1-alpha),cls.minLimit,cls.maxLimit)
+        states[index2]=np.clip(a*(1-alpha)+b*alpha,cls.minLimit,cls.maxLimit)
     
     def mutate(self):
         self.mutateMutRate() #update mutation rate
@@ -167,6 +285,26 @@ class MultivariateIndividual(Individual):
             if self.state[i] < self.minLimit: self.state[i]=self.minLimit
             
         self.fit=None
+
+    @classmethod
+    def mutateArrays(cls,states,mutRate,rng):
+        #self-adaptive Gaussian mutation of a (populationSize, nLength) state
+        # matrix and its mutRate vector, in-place, with all deviates drawn at once
+        mutRate*=np.exp(cls.learningRate*rng.standard_normal(len(mutRate)))
+        np.clip(mutRate,cls.minMutRate,cls.maxMutRate,out=mutRate)
+        states+=((cls.maxLimit-cls.minLimit)*mutRate)[:,None]*rng.standard_normal(states.shape)
+        np.clip(states,cls.minLimit,cls.maxLimit,out=states)
+
+    @classmethod
+    def batchMutate(cls,individuals):
+        #population-level mutation stage: gather, mutate as arrays, write back
+        states=np.array([ind.state for ind in individuals],dtype=float)
+        mutRate=np.array([ind.mutRate for ind in individuals],dtype=float)
+        cls.mutateArrays(states,mutRate,cls.normrng)
+        for ind,state,rate in zip(individuals,states.tolist(),mutRate.tolist()):
+            ind.state=state
+            ind.mutRate=rate
+            ind.fit=None
     
     def evaluateFitness(self):
         if self.fit == None: self.fit=self.__class__.fitFunc(self.state)
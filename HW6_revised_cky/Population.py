@@ -3,11 +3,84 @@
 #
 #
 
-import copy
 import math
+import numpy as np
 from operator import attrgetter
 from Individual import *
 
+
+#Per-row occurrence counts of each item type for a 2-D integer state array,
+# (numStates, nItems), computed with a single bincount
+#
+def itemCounts(states,nItems):
+    n=len(states)
+    offsets=(np.arange(n)*nItems)[:,None]
+    return np.bincount((states+offsets).ravel(),minlength=n*nItems).reshape(n,nItems)
+
+
+#Mating pairs for population-wide crossover: two rounds of disjoint random
+# pairings (index arrays), so every individual takes part in the same expected
+# number of crossovers as with the pairwise loop, each pair kept with
+# probability crossoverFraction
+#
+def crossoverPairs(n,crossoverFraction,rng):
+    half=n//2
+    for rnd in range(2):
+        perm=rng.permutation(n)
+        index1=perm[:half]
+        index2=perm[half:2*half]
+        if crossoverFraction != 1.0:
+            sel=rng.random(half) < crossoverFraction
+            index1=index1[sel]
+            index2=index2[sel]
+        if len(index1) > 0: yield index1,index2
+
+
+#k-way tournament selection on a fitness-like key (larger wins): every
+# individual enters k tournaments (one random permutation per entrant slot,
+# nobody meets itself), ties go to a random entrant.  Returns the winner
+# indices so the caller can gather the winners in one take.
+#
+def tournamentSelect(key,rng,k=2):
+    n=len(key)
+    if k < 2 or k > n: raise Exception('Invalid tournament size: ' + str(k))
+    entrants=np.empty((n,k),dtype=np.intp)
+    for j in range(k):
+        col=entrants[:,j]
+        col[:]=rng.permutation(n)
+        # do not allow self competition: swap clashing entries with random rows
+        while j > 0:
+            clash=np.flatnonzero((entrants[:,:j] == col[:,None]).any(axis=1))
+            if len(clash) == 0: break
+            for i in clash.tolist():
+                r=int(rng.integers(n))
+                col[i],col[r]=col[r],col[i]
+
+    #compete
+    keys=key[entrants]
+    tie=np.where(keys == keys.max(axis=1)[:,None],rng.random((n,k)),-1.0)
+    return entrants[np.arange(n),tie.argmax(axis=1)]
+
+
+#Indices of the k best individuals by partial selection (argpartition, no
+# full sort), in no particular order.  With a primary key (e.g. penalty) the
+# ranking is lexicographic: larger primary first, then larger fit.
+#
+def topIndices(fit,k,primary=None):
+    n=len(fit)
+    if k >= n: return np.arange(n)
+    if primary is None: return np.argpartition(-fit,k-1)[:k]
+
+    #everyone strictly above the k-th best primary value is in,
+    # the remaining slots go to the fittest of those tied with it
+    threshold=np.partition(-primary,k-1)[k-1]
+    above=np.flatnonzero(-primary < threshold)
+    tied=np.flatnonzero(-primary == threshold)
+    need=k-len(above)
+    if need < len(tied): tied=tied[np.argpartition(-fit[tied],need-1)[:need]]
+    return np.concatenate((above,tied))
+
+
 class Population:
     """
     Population
@@ -16,6 +89,14 @@ class Population:
     crossoverFraction=None
     individualType=None
     mode=None
+    batchMutation=False
+    batchCrossover=False
+    tournamentSize=2
+    truncationMethod='sort'     #'sort': full sort, 'partial': partial selection of the survivors
+    rng=None    #NumPy Generator for population-level (batch) operators
+    fitnessCache=None   #optional FitnessCache, for deterministic evaluators only
+    asyncEvaluator=None     #optional AsyncEvaluator, scores batches concurrently on an external evaluator
+    evaluationCounts={'evaluations': 0,'deltaEvaluations': 0}   #fitness computations since the last takeEvaluationCounts()
 
     
     def __init__(self, populationSize):
@@ -23,8 +104,13 @@ class Population:
         Population constructor
         """
         self.population=[]
+        self.shared=False
+        #individuals evaluate themselves on construction, unless an external evaluator scores them
+        external=self.asyncEvaluator is not None
         for i in range(populationSize):
-            self.population.append(self.__class__.individualType())                                                                                                                                        
+            self.population.append(self.__class__.individualType(evaluate=not external))
+        if external: self.evaluateFitness()
+        else: self.evaluationCounts['evaluations']+=populationSize
 
     def __len__(self):
         return len(self.population)
@@ -33,19 +119,88 @@ class Population:
         return self.population[key]
     
     def __setitem__(self,key,newValue):
+        self.unshare()
         self.population[key]=newValue
         
     def copy(self):
-        return copy.deepcopy(self)
+        #copy-on-write: share the individuals until an operator modifies them
+        other=self.__class__.__new__(self.__class__)
+        other.population=list(self.population)
+        other.shared=True
+        return other
+
+    def toArrays(self):
+        #per-individual data as arrays (fit keeps its int/float type), for checkpoints
+        data={'state': np.array([individual.state for individual in self.population]),
+              'fit': np.array([individual.fit for individual in self.population]),
+              'mutRate': np.array([individual.mutRate for individual in self.population],dtype=float)}
+        if issubclass(self.individualType,IntVectorIndividual):
+            data['penalty']=np.array([individual.penalty for individual in self.population],dtype=np.int64)
+        return data
+
+    @classmethod
+    def fromArrays(cls,data):
+        #rebuild a population from toArrays() output
+        penalty=data['penalty'].tolist() if 'penalty' in data else [None]*len(data['fit'])
+        population=cls.__new__(cls)
+        population.population=[cls.individualType.fromData(state,fit,mutRate,pen) for state,fit,mutRate,pen in
+                               zip(data['state'].tolist(),data['fit'].tolist(),data['mutRate'].tolist(),penalty)]
+        population.shared=False
+        return population
+
+    def unshare(self):
+        #clone the individuals still shared with the population this was copied from
+        if self.shared:
+            self.population=[individual.clone() for individual in self.population]
+            self.shared=False
             
+    @classmethod
+    def takeEvaluationCounts(cls):
+        #evaluation counts since the previous call, as extra per-generation stats fields
+        counts=dict(cls.evaluationCounts)
+        for name in cls.evaluationCounts: cls.evaluationCounts[name]=0
+        return counts
+
+    @classmethod
+    def scoreStates(cls,states):
+        #fitness list for a 2-D state array, in one call if the evaluator has a batch function
+        # (or submitted concurrently to the async evaluator)
+        cls.evaluationCounts['evaluations']+=len(states)
+        if cls.asyncEvaluator is not None: return cls.asyncEvaluator.evaluateStates(states.tolist())
+        indType=cls.individualType
+        if indType.batchFitFunc is not None: return indType.batchFitFunc(states).tolist()
+        return [indType.fitFunc(state) for state in states.tolist()]
+
     def evaluateFitness(self):
-        for individual in self.population: individual.evaluateFitness()
+        #score every individual whose fit is None in one batch call (looking the
+        # genomes up in the cache first), except those cheap enough to update incrementally
+        # (never with an external evaluator, whose scores the local delta would not match)
+        pending=[]
+        numDelta=0
+        incremental=self.asyncEvaluator is None
+        for individual in self.population:
+            if individual.fit is None:
+                if incremental and individual.updateFitness(): numDelta+=1
+                else: pending.append(individual)
+        self.evaluationCounts['deltaEvaluations']+=numDelta
+        if len(pending) == 0: return
+        states=np.array([individual.state for individual in pending])
+        fits=self.fitnessCache.evaluate(states,self.scoreStates) if self.fitnessCache is not None else self.scoreStates(states)
+        for individual,fit in zip(pending,fits): individual.fit=fit
             
     def mutate(self):     
+        self.unshare()
+        if self.batchMutation and hasattr(self.individualType,'batchMutate'):
+            self.individualType.batchMutate(self.population)
+            return
         for individual in self.population:
             individual.mutate()
             
     def crossover(self):
+        self.unshare()
+        if self.batchCrossover and hasattr(self.individualType,'crossoverArrays'):
+            self.crossoverBatch()
+            return
         indexList1=list(range(len(self)))
         indexList2=list(range(len(self)))
         self.uniprng.shuffle(indexList1)
@@ -60,62 +215,44 @@ class Population:
                 if rn < self.crossoverFraction:
                     self[index1].crossover(self[index2])        
         
+
+    def crossoverBatch(self):
+        #population-level crossover stage: gather the genomes into one matrix,
+        # recombine all mating pairs at once, write back the rows that took part
+        indType=self.individualType
+        states=np.array([individual.state for individual in self.population])
+        touched=np.zeros(len(self),dtype=bool)
+        for index1,index2 in crossoverPairs(len(self),self.crossoverFraction,self.rng):
+            indType.crossoverArrays(states,index1,index2,self.rng)
+            touched[index1]=True
+            touched[index2]=True
+
+        repair=self.mode == 2 and issubclass(indType,IntVectorIndividual)
+        for i in np.flatnonzero(touched).tolist():
+            self.population[i].setState(states[i])
+            if repair:
+                self.population[i].repair()
+                self.population[i].keepFitIfUnchanged()
             
     def conductTournament(self):
-        # binary tournament
-        indexList1=list(range(len(self)))
-        indexList2=list(range(len(self)))
-        
-        self.uniprng.shuffle(indexList1)
-        self.uniprng.shuffle(indexList2)
-        
-        # do not allow self competition
-        for i in range(len(self)):
-            if indexList1[i] == indexList2[i]:
-                temp=indexList2[i]
-                if i == 0:
-                    indexList2[i]=indexList2[-1]
-                    indexList2[-1]=temp
-                else:
-                    indexList2[i]=indexList2[i-1]
-                    indexList2[i-1]=temp
-        
-        #compete
-        newPop=[]
-        if(self.mode == 1): #### Constrained Tournaments
-            for index1,index2 in zip(indexList1,indexList2):
-                if self[index1].penalty > self[index2].penalty:
-                    newPop.append(copy.deepcopy(self[index1]))
-                elif self[index1].penalty < self[index2].penalty:
-                    newPop.append(copy.deepcopy(self[index2]))
-                else:
-                    rn=self.uniprng.random()
-                    if rn > 0.5:
-                        newPop.append(copy.deepcopy(self[index1]))
-                    else:
-                        newPop.append(copy.deepcopy(self[index2]))
+        # k-way tournament (binary by default), on penalty for constrained tournaments
+        attr='penalty' if self.mode == 1 else 'fit'
+        key=np.fromiter((getattr(individual,attr) for individual in self.population),dtype=float,count=len(self))
+        winners=tournamentSelect(key,self.rng,self.tournamentSize)
 
-        else:
-            for index1,index2 in zip(indexList1,indexList2):
-                if self[index1].fit > self[index2].fit:
-                    newPop.append(copy.deepcopy(self[index1]))
-                elif self[index1].fit < self[index2].fit:
-                    newPop.append(copy.deepcopy(self[index2]))
-                else:
-                    rn=self.uniprng.random()
-                    if rn > 0.5:
-                        newPop.append(copy.deepcopy(self[index1]))
-                    else:
-                        newPop.append(copy.deepcopy(self[index2]))
-        
-        # overwrite old pop with newPop    
-        self.population=newPop        
+        # overwrite old pop with the winners, shared (copy-on-write) until an operator modifies them
+        self.population=[self.population[i] for i in winners.tolist()]
+        self.shared=True
 
 
     def combinePops(self,otherPop):
         self.population.extend(otherPop.population)
 
     def truncateSelect(self,newPopSize):
+        if self.truncationMethod == 'partial':
+            self.partialTruncateSelect(newPopSize)
+            return
+
         if(self.mode == 1):
             self.population.sort(key=attrgetter('penalty'),reverse=True)
             penalty_ind_counts = 0
@@ -131,6 +268,13 @@ class Population:
         
         #then truncate the bottom
         self.population=self.population[:newPopSize]  
+
+    def partialTruncateSelect(self,newPopSize):
+        #keep the top newPopSize without sorting, penalty first for constrained mode
+        n=len(self)
+        fit=np.fromiter((individual.fit for individual in self.population),dtype=float,count=n)
+        penalty=np.fromiter((individual.penalty for individual in self.population),dtype=float,count=n) if self.mode == 1 else None
+        self.population=[self.population[i] for i in topIndices(fit,newPopSize,penalty).tolist()]
                 
     def __str__(self):
         s=''
@@ -139,7 +283,11 @@ class Population:
         return s
     
     def compute_penalty(self):
-        for individual in self.population: individual.panelty_value()
+        self.unshare()
+        #count the missing item types of the whole population at once
+        states=np.array([individual.state for individual in self.population])
+        penalties=(-np.count_nonzero(itemCounts(states,self.individualType.nItems) == 0,axis=1)).tolist()
+        for individual,penalty in zip(self.population,penalties): individual.penalty=penalty
 
 
         
@@ -0,0 +1,54 @@
+#
+# copy_benchmark.py: time one generation's copying work (population copy +
+#   tournament winners) with the old deepcopy path vs. the clone protocol
+#
+# To run: python copy_benchmark.py --input ev3a_example.cfg --size 10000
+#
+
+import optparse
+import sys
+import copy
+import timeit
+from Population import *
+from ev3a import EV3_Config,configure
+
+
+#old path: deepcopy the population, then deepcopy every tournament winner
+def deepcopyGeneration(population):
+    offspring=copy.deepcopy(population)
+    offspring.population=[copy.deepcopy(offspring[i]) for i in range(len(offspring))]
+    return offspring
+
+#new path: copy-on-write population copy and tournament, then the winners are
+# cloned once (as the first crossover/mutation of a generation does)
+def cloneGeneration(population):
+    offspring=population.copy()
+    offspring.conductTournament()
+    offspring.unshare()
+    return offspring
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+
+    parser = optparse.OptionParser()
+    parser.add_option("-i", "--input", action="store", dest="inputFileName", help="input filename", default='ev3a_example.cfg')
+    parser.add_option("-s", "--size", action="store", type="int", dest="populationSize", help="population size", default=10000)
+    parser.add_option("-r", "--repeat", action="store", type="int", dest="repeat", help="timing repetitions", default=5)
+    (options, args) = parser.parse_args(argv)
+
+    cfg=EV3_Config(options.inputFileName)
+
+    #same class setup as an ev3a run (generators, evaluator, operators)
+    configure(cfg)
+
+    population=Population(options.populationSize)
+
+    for name,func in (('deepcopy',deepcopyGeneration),('clone',cloneGeneration)):
+        t=min(timeit.repeat(lambda: func(population),number=1,repeat=options.repeat))
+        print('{:10s} {:10.4f} s/generation  ({} individuals, {} evaluator)'.format(name,t,options.populationSize,cfg.evaluator))
+
+
+if __name__ == '__main__':
+    main()
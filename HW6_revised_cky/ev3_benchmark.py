@@ -0,0 +1,192 @@
+#
+# ev3_benchmark.py: headless scaling benchmark for the EV3 engines
+#  (ev3a in this directory, and the hw8 ev3 in ../HW/hw8)
+#
+# To run: python ev3_benchmark.py
+#         python ev3_benchmark.py --sizes 40,400,4000 --lengths 11,101 --output report.json
+#         python ev3_benchmark.py --output new.json --compare old.json
+#
+# Every grid point runs the real generation loop (ev3 with a stats callback, so
+# nothing is printed) in a fresh subprocess with a fixed seed.  Population methods
+# are wrapped with timers to split wall time into phases, and the subprocess
+# peak RSS is reported as peak memory.  The JSON report can be compared
+# between revisions with --compare.
+#
+
+import optparse
+import sys
+import os
+import json
+import time
+import platform
+import itertools
+import subprocess
+import importlib
+
+try:
+    import resource
+except ImportError:
+    resource=None
+
+
+benchDir=os.path.dirname(os.path.abspath(__file__))
+
+#engine name: (directory, driver module, default config file)
+engines={'ev3a': (benchDir,'ev3a','ev3a_example.cfg'),
+         'hw8': (os.path.join(benchDir,'..','HW','hw8'),'EC_hw8_cky','hw8_parameters.cfg')}
+
+#timed phase: Population methods that belong to it
+phases={'copy': ['copy'],
+        'tournament': ['conductTournament'],
+        'crossover': ['crossover'],
+        'mutate': ['mutate'],
+        'penalty': ['compute_penalty'],
+        'evaluate': ['evaluateFitness'],
+        'truncate': ['combinePops','truncateSelect']}
+
+#parameters identifying one grid point (used to match runs in --compare)
+keyParams=('engine','evaluator','populationType','populationSize','length','crossoverFraction','generationCount','randomSeed')
+
+
+def timedMethod(method,phase,phaseTimes):
+    def timed(self,*args,**kwargs):
+        start=time.perf_counter()
+        try:
+            return method(self,*args,**kwargs)
+        finally:
+            phaseTimes[phase]+=time.perf_counter()-start
+    return timed
+
+
+def instrument(cls,phaseTimes):
+    #wrap the phase methods defined on cls with wall-clock timers
+    for phase,methods in phases.items():
+        for name in methods:
+            if name in cls.__dict__: setattr(cls,name,timedMethod(cls.__dict__[name],phase,phaseTimes))
+
+
+def runWorker(params):
+    """
+    Run one grid point in this process and return its result record
+    """
+    engineDir,moduleName,cfgFile=engines[params['engine']]
+    sys.path.insert(0,engineDir)
+    driver=importlib.import_module(moduleName)
+
+    cfg=driver.EV3_Config(os.path.join(engineDir,cfgFile))
+    cfg.evaluator=params['evaluator']
+    cfg.populationSize=params['populationSize']
+    cfg.generationCount=params['generationCount']
+    cfg.crossoverFraction=params['crossoverFraction']
+    cfg.randomSeed=params['randomSeed']
+    if cfg.evaluator == 'particles1d': cfg.latticeLength=params['length']
+    else: cfg.rastriginN=params['length']
+    if hasattr(cfg,'populationType'): cfg.populationType=params['populationType']
+    cfg.statsFile=None
+    cfg.dumpInterval=None
+
+    phaseTimes=dict((phase,0.0) for phase in phases)
+    for cls in (getattr(driver,'Population',None),getattr(driver,'ArrayPopulation',None)):
+        if cls is not None: instrument(cls,phaseTimes)
+
+    records=[]
+    start=time.perf_counter()
+    driver.ev3(cfg,callback=records.append)
+    wallTime=time.perf_counter()-start
+
+    result=dict(params)
+    result['wallTime']=wallTime
+    result['phases']=phaseTimes
+    result['generationsPerSecond']=cfg.generationCount/wallTime if wallTime > 0 else None
+    result['peakMemoryKB']=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None
+    result['finalBest']=records[-1]['best'] if records else None
+    return result
+
+
+def gitRevision():
+    try:
+        return subprocess.run(['git','rev-parse','HEAD'],cwd=benchDir,capture_output=True,text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compareReports(newReport,oldFileName):
+    with open(oldFileName,'r') as infile:
+        oldReport=json.load(infile)
+    oldResults=dict((tuple(r.get(k) for k in keyParams),r) for r in oldReport['results'])
+
+    print('')
+    print('Comparison against {} (revision {})'.format(oldFileName,oldReport['meta'].get('revision')))
+    print('{:>6s} {:>12s} {:>7s} {:>8s} {:>7s} {:>5s} {:>10s} {:>10s} {:>8s}'.format('engine','evaluator','popType','popSize','length','xover','old[s]','new[s]','speedup'))
+    for r in newReport['results']:
+        old=oldResults.get(tuple(r.get(k) for k in keyParams))
+        if old is None or 'wallTime' not in old or 'wallTime' not in r: continue
+        print('{:>6s} {:>12s} {:>7s} {:>8d} {:>7d} {:>5.2f} {:>10.4f} {:>10.4f} {:>7.2f}x'.format(r['engine'],r['evaluator'],str(r['populationType']),r['populationSize'],
+              r['length'],r['crossoverFraction'],old['wallTime'],r['wallTime'],old['wallTime']/r['wallTime']))
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+
+    parser = optparse.OptionParser()
+    parser.add_option("--worker", action="store", dest="worker", help=optparse.SUPPRESS_HELP, default=None)
+    parser.add_option("-e", "--engines", action="store", dest="engines", help="comma separated engines (ev3a,hw8)", default='ev3a,hw8')
+    parser.add_option("-s", "--sizes", action="store", dest="sizes", help="comma separated population sizes", default='40,400,4000')
+    parser.add_option("-l", "--lengths", action="store", dest="lengths", help="comma separated latticeLength/rastriginN values", default='11,101')
+    parser.add_option("-x", "--crossover", action="store", dest="crossover", help="comma separated crossover fractions", default='0.8')
+    parser.add_option("-v", "--evaluators", action="store", dest="evaluators", help="comma separated evaluators", default='particles1d,rastrigin')
+    parser.add_option("-t", "--population-types", action="store", dest="populationTypes", help="comma separated ev3a population types", default='object,array')
+    parser.add_option("-g", "--generations", action="store", type="int", dest="generations", help="generations per run", default=10)
+    parser.add_option("-r", "--seed", action="store", type="int", dest="seed", help="random seed", default=1234)
+    parser.add_option("-o", "--output", action="store", dest="outputFileName", help="JSON report filename", default='ev3_benchmark.json')
+    parser.add_option("-c", "--compare", action="store", dest="compareFileName", help="earlier JSON report to compare against", default=None)
+    (options, args) = parser.parse_args(argv)
+
+    #worker mode: run one grid point, emit its record as the last stdout line
+    if options.worker is not None:
+        print(json.dumps(runWorker(json.loads(options.worker))))
+        return
+
+    grid=[]
+    for engine,evaluator,size,length,xover in itertools.product(options.engines.split(','),options.evaluators.split(','),
+                                                                   [int(v) for v in options.sizes.split(',')],
+                                                                   [int(v) for v in options.lengths.split(',')],
+                                                                   [float(v) for v in options.crossover.split(',')]):
+        #only ev3a has selectable population backends
+        for popType in (options.populationTypes.split(',') if engine == 'ev3a' else [None]):
+            grid.append({'engine': engine,'evaluator': evaluator,'populationType': popType,'populationSize': size,'length': length,
+                         'crossoverFraction': xover,'generationCount': options.generations,'randomSeed': options.seed})
+
+    results=[]
+    for params in grid:
+        proc=subprocess.run([sys.executable,os.path.abspath(__file__),'--worker',json.dumps(params)],capture_output=True,text=True)
+        lines=proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            result=dict(params)
+            result['error']=(proc.stderr.strip().splitlines() or ['worker failed'])[-1]
+        else:
+            result=json.loads(lines[-1])
+        results.append(result)
+
+        if 'error' in result:
+            print('{engine:>6s} {evaluator:>12s} {populationType!s:>7s} N={populationSize:<7d} L={length:<6d} ERROR: {error}'.format(**result))
+        else:
+            print('{engine:>6s} {evaluator:>12s} {populationType!s:>7s} N={populationSize:<7d} L={length:<6d} {wallTime:9.4f}s {generationsPerSecond:9.2f} gen/s {peakMemoryKB!s:>8s} kB  '.format(**result)+
+                  ' '.join('{}={:.3f}'.format(phase,t) for phase,t in result['phases'].items()))
+
+    report={'meta': {'revision': gitRevision(),
+                     'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                     'python': platform.python_version(),
+                     'platform': platform.platform(),
+                     'argv': argv[1:]},
+            'results': results}
+    with open(options.outputFileName,'w') as outfile:
+        json.dump(report,outfile,indent=1)
+    print('Report written to',options.outputFileName)
+
+    if options.compareFileName is not None: compareReports(report,options.compareFileName)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#
+# ev3_islands.py: island-model EV3, one ev3a population per process with
+#  periodic migration of the best individuals
+#
+#
+# To run: python ev3_islands.py --input ev3a_example.cfg
+#
+# Island options (EV3_Constrained section of the ev3a config):
+#   numIslands: number of islands, each an independently seeded ev3a
+#               population evolving in its own process
+#   migrationInterval: generations between migrations
+#   migrationSize: every island sends copies of its best individuals to its
+#                  target island, where they replace the worst ones
+#   migrationTopology: ring (island i sends to island i+1), or random
+#                      (a new random ring for every migration)
+#
+# Per-generation stats of all islands are combined into one record
+# (best, pooled mean/std, best island) that is printed or streamed to
+# statsFile like ev3a's.  With asyncEvaluator every island process uses
+# its own evaluator client ('local': its own stand-in server).
+#
+
+import optparse
+import sys
+import math
+import queue
+import multiprocessing
+from random import Random
+import numpy as np
+from ev3a import EV3_Config,configure,generation,startAsyncEvaluator
+from Population import *
+from GenerationStats import GenerationStats
+
+
+#Target island of every island for one migration (the same in every process)
+#
+def migrationTargets(cfg,migration):
+    n=cfg.numIslands
+    if cfg.migrationTopology is None or cfg.migrationTopology == 'ring':
+        return [(i+1)%n for i in range(n)]
+
+    #random ring, so every island receives exactly one group of migrants
+    order=list(range(n))
+    Random(cfg.randomSeed+migration).shuffle(order)
+    targets=[None]*n
+    for k in range(n): targets[order[k]]=order[(k+1)%n]
+    return targets
+
+
+def emigrants(population,k):
+    #the k best individuals as arrays, penalty first for constrained tournaments
+    data=population.toArrays()
+    primary=data['penalty'] if Population.mode == 1 and 'penalty' in data else None
+    best=topIndices(data['fit'].astype(float),k,primary)
+    return dict((name,values[best]) for name,values in data.items())
+
+
+def immigrate(population,data):
+    #replace the worst individuals with the immigrants
+    own=population.toArrays()
+    primary=-own['penalty'] if Population.mode == 1 and 'penalty' in own else None
+    worst=topIndices(-own['fit'].astype(float),len(data['fit']),primary)
+    for i,individual in zip(worst.tolist(),Population.fromArrays(data).population):
+        population[i]=individual
+
+
+def receive(inbox,migration,pending):
+    #migrants of the given migration (a fast neighbour may already have sent the next group)
+    while migration not in pending:
+        tag,data=inbox.get()
+        pending[tag]=data
+    return pending.pop(migration)
+
+
+#Island process: ev3a generation loop with migration, stats records
+# are sent to the parent as (island index, record), each record carries
+# the island's current size
+#
+def runIsland(cfg,index,inboxes,results):
+    popType,uniprng,normprng=configure(cfg,cfg.randomSeed+1000*index)
+    stats=GenerationStats(callback=lambda rec: results.put((index,rec)),mode=Population.mode,counters=lambda: {'size': len(population)})
+    pending={}
+
+    server=None
+    try:
+        server=startAsyncEvaluator(cfg)
+        population=popType(cfg.populationSize)
+        stats.record(population,0)
+
+        for i in range(cfg.generationCount):
+            generation(cfg,population)
+
+            if cfg.numIslands > 1 and (i+1) % cfg.migrationInterval == 0 and i+1 < cfg.generationCount:
+                migration=(i+1)//cfg.migrationInterval
+                target=migrationTargets(cfg,migration)[index]
+                inboxes[target].put((migration,emigrants(population,cfg.migrationSize)))
+                immigrate(population,receive(inboxes[index],migration,pending))
+
+            stats.record(population,i+1)
+    finally:
+        if Population.asyncEvaluator is not None:
+            Population.asyncEvaluator.close()
+            Population.asyncEvaluator=None
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def combineStats(records):
+    """
+    Combine the per-island records of one generation (weighted by island size)
+    """
+    records=[records[i] for i in sorted(records)]
+    bestIsland=max(range(len(records)),key=lambda i: records[i]['best'])
+    sizes=np.array([rec['size'] for rec in records],dtype=float)
+    means=np.array([rec['mean'] for rec in records])
+    stds=np.array([rec['std'] for rec in records])
+
+    #pooled mean and sample standard deviation over all islands (a single
+    # member island has no std of its own but still spreads the pool)
+    total=sizes.sum()
+    mean=(sizes*means).sum()/total
+    var=((sizes-1)*np.nan_to_num(stds)**2+sizes*(means-mean)**2).sum()/(total-1) if total > 1 else math.nan
+
+    rec={'generation': records[0]['generation'],
+         'best': records[bestIsland]['best'],
+         'mean': mean.item(),
+         'std': math.sqrt(var),
+         'mutRate': records[bestIsland]['mutRate'],
+         'bestIsland': bestIsland}
+    if 'infeasible' in records[0]: rec['infeasible']=sum(r['infeasible'] for r in records)
+    return rec
+
+
+def printIslandStats(rec):
+    print('Generation:',rec['generation'])
+    print('Max fitness',rec['best'])
+    print('MutRate',rec['mutRate'])
+    print('Avg fitness',rec['mean'])
+    print('Best island',rec['bestIsland'])
+    print('')
+
+
+def nextResult(results,islands):
+    #wait for the next stats record, failing if an island died
+    while True:
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            for i,island in enumerate(islands):
+                if island.exitcode not in (None,0): raise Exception('Island {} failed (exit code {})'.format(i,island.exitcode))
+
+
+#EV3 island model:
+#  callback: optional function receiving each generation's combined stats record
+#
+def ev3Islands(cfg,callback=None):
+    if cfg.numIslands is None or cfg.numIslands < 1: raise Exception('numIslands must be at least 1')
+    if cfg.migrationInterval is None: cfg.migrationInterval=5
+    if cfg.migrationSize is None: cfg.migrationSize=1
+    if cfg.migrationInterval < 1: raise Exception('migrationInterval must be at least 1')
+    if cfg.migrationSize < 1 or cfg.migrationSize > cfg.populationSize: raise Exception('Invalid migrationSize: ' + str(cfg.migrationSize))
+    if cfg.migrationTopology not in (None,'ring','random'): raise Exception('Unknown migration topology: ' + str(cfg.migrationTopology))
+
+    n=cfg.numIslands
+    inboxes=[multiprocessing.Queue() for i in range(n)]
+    results=multiprocessing.Queue()
+    islands=[multiprocessing.Process(target=runIsland,args=(cfg,i,inboxes,results),daemon=True) for i in range(n)]
+
+    #combined records are streamed like ev3a's, or printed
+    stats=GenerationStats(cfg.statsFile,cfg.statsFormat or 'csv') if cfg.statsFile is not None else None
+    try:
+        for island in islands: island.start()
+
+        #a generation is complete once every island reported it
+        pending={}
+        for count in range(n*(cfg.generationCount+1)):
+            index,rec=nextResult(results,islands)
+            records=pending.setdefault(rec['generation'],{})
+            records[index]=rec
+            if len(records) < n: continue
+
+            rec=combineStats(pending.pop(rec['generation']))
+            if stats is not None: stats.write(rec)
+            if callback is not None: callback(rec)
+            if stats is None and callback is None: printIslandStats(rec)
+
+        for island in islands: island.join()
+    finally:
+        for island in islands:
+            if island.is_alive(): island.terminate()
+        if stats is not None: stats.close()
+
+
+#
+# Main entry point
+#
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv
+
+    try:
+        #
+        # get command-line options
+        #
+        parser = optparse.OptionParser()
+        parser.add_option("-i", "--input", action="store", dest="inputFileName", help="input filename", default=None)
+        parser.add_option("-q", "--quiet", action="store_true", dest="quietMode", help="quiet mode", default=False)
+        parser.add_option("-d", "--debug", action="store_true", dest="debugMode", help="debug mode", default=False)
+        (options, args) = parser.parse_args(argv)
+
+        #validate options
+        if options.inputFileName is None:
+            raise Exception("Must specify input file name using -i or --input option.")
+
+        #Get EV3 config params
+        cfg=EV3_Config(options.inputFileName)
+        if cfg.numIslands is None: cfg.numIslands=multiprocessing.cpu_count()
+
+        #print config params
+        print(cfg)
+
+        #run EV3 islands
+        ev3Islands(cfg)
+
+        if not options.quietMode:
+            print('EV3 Islands Completed!')
+
+    except Exception as info:
+        if 'options' in vars() and options.debugMode:
+            from traceback import print_exc
+            print_exc()
+        else:
+            print(info)
+
+
+if __name__ == '__main__':
+    main()
+
@@ -4,12 +4,18 @@
 #
 # To run: python ev3a.py --input ev3_example.cfg
 #         python ev3a.py --input my_params.cfg
+#         python ev3a.py --input my_params.cfg --resume
 #
 # Basic features of ev3a:
 #   - Supports self-adaptive mutation
 #   - Uses binary tournament selection for mating pool
 #   - Uses elitist truncation selection for survivors
 #   - Supports IntegerVector and Multivariate Individual types
+#   - Optional NumPy array-backed population (populationType: array)
+#   - Optional streamed CSV/JSON-lines generation stats (statsFile)
+#   - Optional periodic checkpoints (checkpointFile), continued with --resume
+#   - Optional concurrent fitness evaluation on an external evaluator
+#     (asyncEvaluator: host:port, or local for the EvaluatorServer.py stand-in)
 #
 
 import optparse
@@ -18,7 +24,12 @@ import yaml
 import math
 from random import Random
 from Population import *
+from ArrayPopulation import *
 from Evaluator import *
+from GenerationStats import GenerationStats
+from Checkpoint import saveCheckpoint,loadCheckpoint
+from FitnessCache import FitnessCache
+from AsyncEvaluator import AsyncEvaluator,SocketEvaluator,startLocalServer
 
 
 #EV3 Config class 
@@ -41,7 +52,29 @@ class EV3_Config:
              'rastriginA': (float,False),
              'rastriginN': (int,False),
              'minLimit': (float,False),
-             'maxLimit': (float,False)}
+             'maxLimit': (float,False),
+             'populationType': (str,False),
+             'incrementalFitness': (bool,False),
+             'batchMutation': (bool,False),
+             'batchCrossover': (bool,False),
+             'tournamentSize': (int,False),
+             'truncationMethod': (str,False),
+             'statsFile': (str,False),
+             'statsFormat': (str,False),
+             'dumpInterval': (int,False),
+             'checkpointFile': (str,False),
+             'checkpointInterval': (int,False),
+             'fitnessCacheSize': (int,False),
+             'asyncEvaluator': (str,False),
+             'evaluationConcurrency': (int,False),
+             'evaluationTimeout': (float,False),
+             'evaluationRetries': (int,False),
+             'localEvaluatorDelay': (float,False),
+             'localEvaluatorFailRate': (float,False),
+             'numIslands': (int,False),
+             'migrationInterval': (int,False),
+             'migrationSize': (int,False),
+             'migrationTopology': (str,False)}
      
     #constructor
     def __init__(self, inFileName):
@@ -95,13 +128,79 @@ def printStats(pop,gen):
 
 
 #EV3:
+#  callback: optional function receiving each generation's stats record
+#  resume: continue from cfg.checkpointFile instead of a random initial population
 #            
-def ev3(cfg):
+def ev3(cfg,callback=None,resume=False):
+    if resume and cfg.checkpointFile is None: raise Exception('Resuming requires a checkpointFile')
+
+    popType,uniprng,normprng=configure(cfg)
+    
+    #per-generation reporting: legacy full printout, or streamed stats records
+    if cfg.statsFile is None and callback is None:
+        stats=None
+        report=printStats
+    else:
+        stats=GenerationStats(cfg.statsFile,cfg.statsFormat or 'csv',callback,cfg.dumpInterval,mode=Population.mode,append=resume,counters=generationCounters)
+        report=stats.record
+    server=None
+    try:
+        server=startAsyncEvaluator(cfg)
+        evolve(cfg,popType,report,uniprng,normprng,resume)
+    finally:
+        if Population.asyncEvaluator is not None:
+            Population.asyncEvaluator.close()
+            Population.asyncEvaluator=None
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if stats is not None: stats.close()
+
+
+#Optional external evaluator: batches of dirty individuals are scored
+# concurrently on cfg.asyncEvaluator ('host:port' of an EvaluatorServer.py
+# compatible service, or 'local' to start the stand-in server in a
+# subprocess), returns the local server process (or None)
+#
+def startAsyncEvaluator(cfg):
+    if cfg.asyncEvaluator is None: return None
+
+    server=None
+    if cfg.asyncEvaluator == 'local':
+        if cfg.evaluator == 'particles1d':
+            setup={'evaluator': cfg.evaluator,'selfEnergy': cfg.selfEnergy,'interactionEnergy': cfg.interactionEnergy}
+        else:
+            setup={'evaluator': cfg.evaluator,'rastriginA': cfg.rastriginA,'rastriginN': cfg.rastriginN}
+        server,address=startLocalServer(setup,cfg.localEvaluatorDelay or 0.0,cfg.localEvaluatorFailRate or 0.0)
+    else:
+        address=cfg.asyncEvaluator
+
+    Population.asyncEvaluator=AsyncEvaluator(SocketEvaluator(address),cfg.evaluationConcurrency or 32,cfg.evaluationTimeout,cfg.evaluationRetries or 0)
+    return server
+
+
+#Extra per-generation stats fields: fitness evaluations (full and incremental)
+# fitness cache hits/misses and async evaluation retries
+#
+def generationCounters():
+    rec=Population.takeEvaluationCounts()
+    if Population.fitnessCache is not None: rec.update(Population.fitnessCache.counts())
+    if Population.asyncEvaluator is not None: rec.update(Population.asyncEvaluator.counts())
+    return rec
+
+
+#Set the static params on the Individual/Population/Evaluator classes and
+# start the random number generators, returns (popType, uniprng, normprng)
+#  seed: base random seed (default cfg.randomSeed)
+#
+def configure(cfg,seed=None):
+    if seed is None: seed=cfg.randomSeed
+
     #start random number generators
     uniprng=Random()
-    uniprng.seed(cfg.randomSeed)
+    uniprng.seed(seed)
     normprng=Random()
-    normprng.seed(cfg.randomSeed+101)
+    normprng.seed(seed+101)
 
     #set static params on classes
     # (probably not the most elegant approach, but let's keep things simple...)
@@ -109,11 +208,19 @@ def ev3(cfg):
     Individual.normprng=normprng
     Population.uniprng=uniprng
     Population.crossoverFraction=cfg.crossoverFraction
+    Population.batchCrossover=bool(cfg.batchCrossover)
+    Population.batchMutation=bool(cfg.batchMutation) and cfg.evaluator == 'rastrigin'     #only real-valued states have a batch mutation
+    Population.rng=np.random.default_rng(seed)
+    Population.tournamentSize=cfg.tournamentSize or 2
+    if cfg.truncationMethod not in (None,'sort','partial'): raise Exception('Unknown truncation method: ' + str(cfg.truncationMethod))
+    Population.truncationMethod=cfg.truncationMethod or 'sort'
 
     if cfg.evaluator == 'particles1d':
         Particles1D.selfEnergy=cfg.selfEnergy
         Particles1D.interactionEnergy=cfg.interactionEnergy
         IntVectorIndividual.fitFunc=Particles1D.fitnessFunc
+        IntVectorIndividual.batchFitFunc=Particles1D.batchFitnessFunc
+        IntVectorIndividual.deltaFitFunc=Particles1D.deltaFitnessFunc if cfg.incrementalFitness else None
         IntVectorIndividual.nLength=cfg.latticeLength
         IntVectorIndividual.nItems=cfg.numParticleTypes
         ### Add the mode parameter:
@@ -124,58 +231,98 @@ def ev3(cfg):
         if len(cfg.selfEnergy) != cfg.numParticleTypes: raise Exception('Inconsistent selfEnergy vector length')
         if len(cfg.interactionEnergy) != cfg.numParticleTypes: raise Exception('Inconsistent interactionEnergy matrix size')
         Population.individualType=IntVectorIndividual
+        evaluator=Particles1D
+        cacheType=np.min_scalar_type(cfg.numParticleTypes-1)
     elif cfg.evaluator == 'rastrigin':
         Rastrigin.A=cfg.rastriginA
         Rastrigin.nVars=cfg.rastriginN
         MultivariateIndividual.minLimit=cfg.minLimit
         MultivariateIndividual.maxLimit=cfg.maxLimit
         MultivariateIndividual.fitFunc=Rastrigin.fitnessFunc
+        MultivariateIndividual.batchFitFunc=Rastrigin.batchFitnessFunc
         MultivariateIndividual.nLength=cfg.rastriginN
         MultivariateIndividual.learningRate=1.0/math.sqrt(cfg.rastriginN)
+        MultivariateIndividual.normrng=np.random.default_rng(seed+101)
+        IntVectorIndividual.deltaFitFunc=None
         Population.individualType=MultivariateIndividual
+        evaluator=Rastrigin
+        cacheType=np.float64
     else:
         raise Exception('Unknown evaluator type: ' + str(cfg.evaluator))
-      
-    
-    #create initial Population (random initialization)
-    population=Population(cfg.populationSize)
-        
-    #print initial pop stats    
-    printStats(population,0)
 
-    #evolution main loop
-    for i in range(cfg.generationCount):
-        #create initial offspring population by copying parent pop
-        offspring=population.copy()
-        
-        #select mating pool
+    for name in Population.evaluationCounts: Population.evaluationCounts[name]=0
 
-        offspring.conductTournament()
+    #optional fitness memoization, only valid for deterministic evaluators
+    Population.fitnessCache=None
+    if cfg.fitnessCacheSize:
+        if not getattr(evaluator,'deterministic',False): raise Exception('Fitness cache requires a deterministic evaluator')
+        Population.fitnessCache=FitnessCache(cfg.fitnessCacheSize,cacheType)
+
+    #pick population backend: list of Individual objects or NumPy arrays
+    if cfg.populationType is None or cfg.populationType == 'object':
+        popType=Population
+    elif cfg.populationType == 'array':
+        popType=ArrayPopulation
+    else:
+        raise Exception('Unknown population type: ' + str(cfg.populationType))
+
+    return popType,uniprng,normprng
 
-        #perform crossover
-        offspring.crossover()
-        
-        #random mutation
-        offspring.mutate()
 
-        if (cfg.evaluator == 'particles1d'):
-            if(cfg.mode == 1):
-                #update the penalty values
-                offspring.compute_penalty()
+#EV3 generation loop
+#
+def evolve(cfg,popType,report,uniprng,normprng,resume=False):
+    if resume:
+        #restore population, generation counter and random number generators
+        population,start=loadCheckpoint(cfg.checkpointFile,popType,uniprng,normprng,cfg)
+    else:
+        #create initial Population (random initialization)
+        population=popType(cfg.populationSize)
+        start=0
         
-        #update fitness values
-        offspring.evaluateFitness()
-
-              
-            
-        #survivor selection: elitist truncation using parents+offspring
-        population.combinePops(offspring)
-        population.truncateSelect(cfg.populationSize)
+        #print initial pop stats    
+        report(population,0)
+
+    #evolution main loop
+    for i in range(start,cfg.generationCount):
+        generation(cfg,population)
         
         #print population stats    
-        printStats(population,i+1)
-        
-        
+        report(population,i+1)
+
+        if cfg.checkpointFile is not None and ((i+1) % (cfg.checkpointInterval or 1) == 0 or i+1 == cfg.generationCount):
+            saveCheckpoint(cfg.checkpointFile,population,i+1,uniprng,normprng,cfg)
+
+
+#One EV3 generation, population is replaced in-place by the survivors
+#
+def generation(cfg,population):
+    #create initial offspring population by copying parent pop
+    offspring=population.copy()
+    
+    #select mating pool
+
+    offspring.conductTournament()
+
+    #perform crossover
+    offspring.crossover()
+    
+    #random mutation
+    offspring.mutate()
+
+    if (cfg.evaluator == 'particles1d'):
+        if(cfg.mode == 1):
+            #update the penalty values
+            offspring.compute_penalty()
+    
+    #update fitness values
+    offspring.evaluateFitness()
+
+    #survivor selection: elitist truncation using parents+offspring
+    population.combinePops(offspring)
+    population.truncateSelect(cfg.populationSize)
+
+
 #
 # Main entry point
 #
@@ -191,6 +338,7 @@ def main(argv=None):
         parser.add_option("-i", "--input", action="store", dest="inputFileName", help="input filename", default=None)
         parser.add_option("-q", "--quiet", action="store_true", dest="quietMode", help="quiet mode", default=False)
         parser.add_option("-d", "--debug", action="store_true", dest="debugMode", help="debug mode", default=False)
+        parser.add_option("-r", "--resume", action="store_true", dest="resume", help="resume from the checkpointFile", default=False)
         (options, args) = parser.parse_args(argv)
         
         #validate options
@@ -204,7 +352,7 @@ def main(argv=None):
         print(cfg)
                     
         #run EV3
-        ev3(cfg)
+        ev3(cfg,resume=options.resume)
         
         if not options.quietMode:                    
             print('EV3 Completed!')    
@@ -0,0 +1,60 @@
+#
+# test_repair.py: mode 2 repair of the object and array backends
+#
+#
+# To run: python -m pytest test_repair.py
+#
+
+import os
+import tempfile
+import unittest
+from ev3a import EV3_Config,configure
+from ArrayPopulation import *
+
+
+#6 sites, 6 particle types, no constraint handling so construction does not repair
+cfgText='''EV3_Constrained:
+  populationSize: 4
+  generationCount: 1
+  crossoverFraction: 0.8
+  randomSeed: 1234
+  evaluator: particles1d
+  latticeLength: 6
+  numParticleTypes: 6
+  selfEnergy: [1, 2, 3, 4, 5, 6]
+  interactionEnergy: [[1,0,0,0,0,0],[0,1,0,0,0,0],[0,0,1,0,0,0],[0,0,0,1,0,0],[0,0,0,0,1,0],[0,0,0,0,0,1]]
+  populationType: array
+'''
+
+
+class RepairTest(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile('w',suffix='.cfg',delete=False) as cfgFile:
+            cfgFile.write(cfgText)
+        try:
+            configure(EV3_Config(cfgFile.name))
+        finally:
+            os.remove(cfgFile.name)
+
+    def testArrayRepairFillsMissingItems(self):
+        pop=ArrayPopulation(2)
+        pop.state[:]=[[0,0,0,0,1,2],[5,5,5,3,4,5]]
+        pop.repair([0,1])
+        for row in pop.state.tolist(): self.assertEqual(sorted(row),[0,1,2,3,4,5])
+
+    def testRepairUsesAllSurplusSites(self):
+        #3 item types missing, more than the 2 sites of the most frequent item
+        for trial in range(20):
+            pop=ArrayPopulation(1)
+            pop.state[0]=[0,0,1,1,2,2]
+            pop.repair([0])
+            self.assertEqual(sorted(pop.state[0].tolist()),[0,1,2,3,4,5])
+
+            individual=IntVectorIndividual(evaluate=False)
+            individual.state=[0,0,1,1,2,2]
+            individual.repair()
+            self.assertEqual(sorted(individual.state),[0,1,2,3,4,5])
+
+
+if __name__ == '__main__':
+    unittest.main()